@@ -5,16 +5,95 @@ Supports environment variables and config file
 """
 
 import os
+import copy
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _to_bool(value: str) -> bool:
+    """Interpret common truthy strings as True"""
+    return value.lower() in {"true", "1", "yes", "on"}
+
+def _to_list(value: str) -> List[str]:
+    """Split a comma-separated string into a list of trimmed items"""
+    return [item.strip() for item in value.split(",")]
+
+# Converters for string values (env vars, CLI) keyed by config key name;
+# keys not listed here are stored as plain strings
+VALUE_CONVERTERS = {
+    "port": int,
+    "scan_timeout": int,
+    "rescan_delay": int,
+    "hotspot_disable_delay": int,
+    "cache_duration": int,
+    "enabled": _to_bool,
+    "startup_check": _to_bool,
+    "origins": _to_list,
+    "connections_to_delete": _to_list,
+}
+
+# Names of the converted types, for messages about values that fail to convert
+CONVERTER_TYPE_NAMES = {
+    int: "integer",
+    _to_bool: "boolean",
+    _to_list: "list",
+}
+
+# Environment variables grouped by the config section they override,
+# as (env_var, key) pairs; values are converted via VALUE_CONVERTERS
+_ENV_MAPPINGS = {
+    ("server",): (
+        ("WIFI_SERVER_HOST", "host"),
+        ("WIFI_SERVER_PORT", "port"),
+        ("WIFI_SERVER_LOG_LEVEL", "log_level"),
+    ),
+    ("wifi",): (
+        ("WIFI_HOTSPOT_NAME_PREFIX", "hotspot_name_prefix"),
+        ("WIFI_HOTSPOT_PASSWORD", "hotspot_password"),
+        ("WIFI_SCAN_TIMEOUT", "scan_timeout"),
+        ("WIFI_RESCAN_DELAY", "rescan_delay"),
+        ("WIFI_HOTSPOT_DISABLE_DELAY", "hotspot_disable_delay"),
+        ("WIFI_STARTUP_CHECK", "startup_check"),
+        ("WIFI_GATEWAY", "gateway"),
+        ("WIFI_DHCP_RANGE", "dhcp_range"),
+        ("WIFI_LOG_FILE", "log_file"),
+        ("WIFI_CACHE_DURATION", "cache_duration"),
+        ("WIFI_HOTSPOT_NAME", "hotspot_name"),
+    ),
+    ("cors",): (
+        ("WIFI_CORS_ENABLED", "enabled"),
+        ("WIFI_CORS_ORIGINS", "origins"),
+    ),
+    ("direct",): (
+        ("DIRECT_HOTSPOT_NAME", "hotspot_name"),
+    ),
+    ("wifi", "startup_cleanup"): (
+        ("WIFI_STARTUP_CLEANUP_ENABLED", "enabled"),
+        ("WIFI_STARTUP_CLEANUP_CONNECTIONS", "connections_to_delete"),
+    ),
+}
+
 class Config:
     """Minimal configuration class for WiFi API Server"""
     
     def __init__(self, config_file: str = "/data/wifi_config.json"):
         self.config_file = Path(config_file)
-        self._config = self._load_config()
+        # Loaded on first access, see _cfg: constructing a Config (or calling
+        # get_config) reads neither the file nor the environment
+        self._config = None
+        self._flat = None  # dotted-key snapshot for get, reset by setters
+    
+    @property
+    def _cfg(self) -> Dict[str, Any]:
+        """Configuration dict, loaded from file and environment on first use"""
+        if self._config is None:
+            self._config = self._load_config()
+        return self._config
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file and environment variables"""
@@ -55,10 +134,13 @@ class Config:
         # Load from config file if it exists
         if self.config_file.exists():
             try:
-                with open(self.config_file, 'r') as f:
-                    file_config = json.load(f)
-                    # Merge with defaults
-                    self._merge_config(default_config, file_config)
+                if orjson is not None:
+                    file_config = orjson.loads(self.config_file.read_bytes())
+                else:
+                    with open(self.config_file, 'r') as f:
+                        file_config = json.load(f)
+                # Merge with defaults
+                self._merge_config(default_config, file_config)
             except Exception as e:
                 print(f"Warning: Could not load config file {self.config_file}: {e}")
         
@@ -68,111 +150,109 @@ class Config:
         return default_config
     
     def _merge_config(self, base: Dict[str, Any], override: Dict[str, Any]):
-        """Recursively merge configuration dictionaries"""
-        for key, value in override.items():
-            if key in base and isinstance(base[key], dict) and isinstance(value, dict):
-                self._merge_config(base[key], value)
-            else:
-                base[key] = value
+        """Merge nested configuration dictionaries, walking levels with an explicit stack"""
+        stack = [(base, override)]
+        while stack:
+            base_level, override_level = stack.pop()
+            for key, value in override_level.items():
+                base_value = base_level.get(key)
+                if isinstance(base_value, dict) and isinstance(value, dict):
+                    if base_value is not value:
+                        stack.append((base_value, value))
+                else:
+                    base_level[key] = value
     
     def _load_env_vars(self, config: Dict[str, Any]):
         """Load configuration from environment variables"""
-        env_mappings = {
-            "WIFI_SERVER_HOST": ("server", "host"),
-            "WIFI_SERVER_PORT": ("server", "port"),
-            "WIFI_SERVER_LOG_LEVEL": ("server", "log_level"),
-            "WIFI_HOTSPOT_NAME_PREFIX": ("wifi", "hotspot_name_prefix"),
-            "WIFI_HOTSPOT_PASSWORD": ("wifi", "hotspot_password"),
-            "WIFI_SCAN_TIMEOUT": ("wifi", "scan_timeout"),
-            "WIFI_RESCAN_DELAY": ("wifi", "rescan_delay"),
-            "WIFI_HOTSPOT_DISABLE_DELAY": ("wifi", "hotspot_disable_delay"),
-            "WIFI_STARTUP_CHECK": ("wifi", "startup_check"),
-            "WIFI_GATEWAY": ("wifi", "gateway"),
-            "WIFI_DHCP_RANGE": ("wifi", "dhcp_range"),
-            "WIFI_LOG_FILE": ("wifi", "log_file"),
-            "WIFI_CACHE_DURATION": ("wifi", "cache_duration"),
-            "WIFI_CORS_ENABLED": ("cors", "enabled"),
-            "WIFI_CORS_ORIGINS": ("cors", "origins"),
-            "WIFI_HOTSPOT_NAME": ("wifi", "hotspot_name"),
-            "DIRECT_HOTSPOT_NAME": ("direct", "hotspot_name"),
-            "WIFI_STARTUP_CLEANUP_ENABLED": ("wifi", "startup_cleanup", "enabled"),
-            "WIFI_STARTUP_CLEANUP_CONNECTIONS": ("wifi", "startup_cleanup", "connections_to_delete"),
-        }
-        
-        for env_var, config_path in env_mappings.items():
-            value = os.getenv(env_var)
-            if value is not None:
-                # Navigate to the nested config location
-                current = config
-                for key in config_path[:-1]:
-                    if key not in current:
-                        current[key] = {}
-                    current = current[key]
+        env = os.environ
+        for section_path, mappings in _ENV_MAPPINGS.items():
+            # Navigate to the section once for all of its variables
+            section = None
+            for env_var, key in mappings:
+                value = env.get(env_var)
+                if value is None:
+                    continue
+                if section is None:
+                    section = config
+                    for name in section_path:
+                        section = section.setdefault(name, {})
                 
                 # Convert value based on expected type
-                key = config_path[-1]
-                if key in ["port", "scan_timeout", "rescan_delay", "hotspot_disable_delay", "cache_duration"]:
-                    try:
-                        current[key] = int(value)
-                    except ValueError:
-                        print(f"Warning: Invalid integer value for {env_var}: {value}")
-                elif key in ["enabled", "startup_check"]:
-                    current[key] = value.lower() in ["true", "1", "yes", "on"]
-                elif key in ["origins", "connections_to_delete"]:
-                    current[key] = [item.strip() for item in value.split(",")]
-                else:
-                    current[key] = value
+                converter = VALUE_CONVERTERS.get(key, str)
+                try:
+                    section[key] = converter(value)
+                except ValueError:
+                    type_name = CONVERTER_TYPE_NAMES.get(converter, "string")
+                    print(f"Warning: Invalid {type_name} value for {env_var}: {value}")
         
         # Handle RESIN_DEVICE_UUID for unique hotspot names
-        resin_uuid = os.getenv("RESIN_DEVICE_UUID")
+        resin_uuid = env.get("RESIN_DEVICE_UUID")
         if resin_uuid:
             # Use first 5 characters of RESIN_DEVICE_UUID for unique identification
             device_id = resin_uuid[:5]
             
             # Set default hotspot names with device ID if not already set via env vars
-            if not os.getenv("WIFI_HOTSPOT_NAME"):
+            if not env.get("WIFI_HOTSPOT_NAME"):
                 config["wifi"]["hotspot_name"] = f"Envoid-Connect-{device_id}"
             
-            if not os.getenv("DIRECT_HOTSPOT_NAME"):
+            if not env.get("DIRECT_HOTSPOT_NAME"):
                 config["direct"]["hotspot_name"] = f"Envoid-Direct-{device_id}"
     
+    def _flatten(self) -> Dict[str, Any]:
+        """Build a {"section.key": value} snapshot of every configuration level"""
+        flat = {}
+        stack = [("", self._cfg)]
+        while stack:
+            prefix, level = stack.pop()
+            for key, value in level.items():
+                path = prefix + key
+                flat[path] = value
+                if isinstance(value, dict):
+                    stack.append((path + ".", value))
+        return flat
+    
     def get(self, key: str, default: Any = None) -> Any:
-        """Get configuration value using dot notation"""
-        keys = key.split('.')
-        value = self._config
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        """Get configuration value using dot notation.
+
+        Sections and lists are the stored objects and must be treated as
+        read-only; change the configuration through set_config_value.
+        """
+        if self._flat is None:
+            self._flat = self._flatten()
+        return self._flat.get(key, default)
+    
+    def _section(self, name: str) -> Dict[str, Any]:
+        """Return a copy of a top-level section, which callers may change freely"""
+        return copy.deepcopy(self._cfg[name])
     
     def get_server_config(self) -> Dict[str, Any]:
         """Get server configuration"""
-        return self._config["server"]
+        return self._section("server")
     
     def get_connect_config(self) -> Dict[str, Any]:
         """Get WiFi configuration"""
-        return self._config["wifi"]
+        return self._section("wifi")
     
     def get_direct_config(self) -> Dict[str, Any]:
         """Get WiFi configuration"""
-        return self._config["direct"]
+        return self._section("direct")
     
     def get_cors_config(self) -> Dict[str, Any]:
         """Get CORS configuration"""
-        return self._config["cors"]
+        return self._section("cors")
     
     def get_connection_name(self) -> str:
         """Get Connecetion name"""
-        return self._config["connection"]["name"]
+        return self._cfg["connection"]["name"]
 
     def save_config(self) -> bool:
         """Save current configuration to file"""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self._config, f, indent=2)
+            if orjson is not None:
+                self.config_file.write_bytes(orjson.dumps(self._cfg, option=orjson.OPT_INDENT_2))
+            else:
+                with open(self.config_file, 'w') as f:
+                    json.dump(self._cfg, f, indent=2)
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
@@ -181,18 +261,19 @@ class Config:
     def print_config(self):
         """Print current configuration"""
         print("Current Configuration:")
-        print(json.dumps(self._config, indent=2))
+        print(json.dumps(self._cfg, indent=2))
 
     #set config value
     def set_config_value(self, key: str, value: Any):
         """Set a configuration value"""
         keys = key.split('.')
-        current = self._config
+        current = self._cfg
         for k in keys[:-1]:
             if k not in current:
                 current[k] = {}
             current = current[k]
         current[keys[-1]] = value
+        self._flat = None
 # Global config instance
 _config_instance: Optional[Config] = None
 
@@ -6,7 +6,7 @@ Helps manage configuration settings
 
 import argparse
 import sys
-from config import get_config, create_default_config
+from config import get_config, create_default_config, VALUE_CONVERTERS, CONVERTER_TYPE_NAMES
 
 def show_config():
     """Show current configuration"""
@@ -17,30 +17,16 @@ def set_config_value(key: str, value: str):
     """Set a configuration value"""
     config = get_config()
     
-    # Parse the key (e.g., "server.port" -> ["server", "port"])
-    keys = key.split('.')
-    
-    # Navigate to the nested location
-    current = config._config
-    for k in keys[:-1]:
-        if k not in current:
-            current[k] = {}
-        current = current[k]
-    
-    # Set the value with type conversion
-    key_name = keys[-1]
-    if key_name in ["port", "scan_timeout", "rescan_delay"]:
-        try:
-            current[key_name] = int(value)
-        except ValueError:
-            print(f"Error: {value} is not a valid integer for {key}")
-            return False
-    elif key_name == "enabled":
-        current[key_name] = value.lower() in ["true", "1", "yes", "on"]
-    elif key_name == "origins":
-        current[key_name] = [origin.strip() for origin in value.split(",")]
-    else:
-        current[key_name] = value
+    # Convert by the last part of the key (e.g., "server.port" -> "port")
+    key_name = key.rsplit('.', 1)[-1]
+    converter = VALUE_CONVERTERS.get(key_name, str)
+    try:
+        converted = converter(value)
+    except ValueError:
+        type_name = CONVERTER_TYPE_NAMES.get(converter, "string")
+        print(f"Error: {value} is not a valid {type_name} for {key}")
+        return False
+    config.set_config_value(key, converted)
     
     # Save the configuration
     if config.save_config():
@@ -1,16 +1,58 @@
 #!/usr/bin/env python3
 import argparse
+import email.utils
+import errno
 import os
 import subprocess
 import sys
 import json
 import re
+import shutil
+import socket
+import stat
 import time
 import logging
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import selectors
 import threading
 import mimetypes
-from datetime import datetime, timedelta
+import functools
+import gzip
+from urllib.parse import parse_qs
+from datetime import datetime
+
+# Prefer orjson for request/response (de)serialization, then ujson, then stdlib json.
+# Decode errors from all three are ValueError subclasses.
+try:
+    import orjson
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    try:
+        import ujson
+        def _dumps(obj):
+            # Same compact UTF-8 output as orjson
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode()
+        _loads = ujson.loads
+    except ImportError:
+        # json.dumps builds a new encoder per call when given options; keep one
+        _json_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+        def _dumps(obj):
+            # Same compact UTF-8 output as orjson
+            return _json_encode(obj).encode()
+        _loads = json.loads
+
+# Upper bounds (seconds) for one-shot binary runs, so a wedged binary
+# cannot hold a request, or the wrapper's state lock, indefinitely
+_TIMEOUT_STATUS = 5
+_TIMEOUT_SCAN = 20
+_TIMEOUT_STOP = 15
+_TIMEOUT_START = 15
+_TIMEOUT_FORGET = 15
+_TIMEOUT_CONNECT = 30
 
 # Configure logging
 def setup_logging():
@@ -29,18 +71,152 @@ logger = setup_logging()
 
 touchscreen = os.getenv('ENABLE_SURFACE_SUPPORT')
 
+# "Key: value" lines of a running hotspot's --check-hotspot report, compiled once at import
+_HOTSPOT_FIELDS_RE = re.compile(
+    rb'^[ \t]*(SSID|Gateway|Interface|Password Protected|Uptime): (.*)$', re.MULTILINE)
+
+# Fallback pattern for connected-network output that is not on one line,
+# compiled once at import and matched in a single finditer-style pass. Values
+# stop at the first comma or line end via a negated class, so matching is
+# linear with no lazy-quantifier backtracking
+_CONNECTED_FIELDS_RE = re.compile(rb'(SSID|Security|Signal|Interface|IP): ([^,\n]*)')
+
+def _text(raw):
+    """Decode a field extracted from raw binary output"""
+    return raw.decode('utf-8', 'replace')
+
+def _decoded(fields, key, default=None):
+    """Decode and trim fields[key], or return default when it is missing"""
+    value = fields.get(key)
+    return default if value is None else _text(value.strip())
+
+def _section_start(output, marker):
+    """Return the offset just past the first marker in output, or -1 when it is absent"""
+    idx = output.find(marker)
+    return idx if idx < 0 else idx + len(marker)
+
+def _connected_section(output):
+    """Return the bytes after b"Connected Network:" (or a bare b"Connected:"), or None.
+
+    Walks the buffer once, checking what follows each b"Connected" in place;
+    b"Connected Network:" wins over an earlier bare b"Connected:" as before.
+    """
+    bare = None
+    idx = output.find(b"Connected")
+    while idx >= 0:
+        tail = idx + 9
+        if output.startswith(b" Network:", tail):
+            return output[tail + 9:]
+        if bare is None and output.startswith(b":", tail):
+            bare = tail + 1
+        idx = output.find(b"Connected", tail)
+    return None if bare is None else output[bare:]
+
+def _parse_kv_line(line):
+    """Split b"Key: value, Key: value" into a {key: raw value} dict"""
+    return dict(part.split(b": ", 1) for part in line.split(b", ") if b": " in part)
+
+def _first_fields(pattern, data, pos=0):
+    """Map each key a (key, value) pattern finds in data from pos on to its first value.
+
+    One finditer pass over data, filling the dict as matches arrive.
+    """
+    fields = {}
+    for match in pattern.finditer(data, pos):
+        fields.setdefault(match[1], match[2])
+    return fields
+
+def _parse_hotspot_fields(output, pos=0):
+    """Collect the known hotspot b"Key: value" lines from pos on into a {key: raw value} dict"""
+    return _first_fields(_HOTSPOT_FIELDS_RE, output, pos)
+
+def _parse_network_entries(output, start=0, skip_status=False):
+    """Yield decoded (ssid, security) pairs from b"SSID: <name>, Security: <type>" lines.
+
+    Walks the lines of output from offset start in place and slices out just
+    the two field values, located with bounded finds; strip() hands back the
+    same object when a value is already trimmed, as the binary prints them.
+    Entries with an empty SSID, and b"(..." status indicators when skip_status
+    is set, are dropped before anything is decoded.
+    """
+    end = len(output)
+    while start < end:
+        eol = output.find(b"\n", start)
+        if eol < 0:
+            eol = end
+        line_start, start = start, eol + 1
+        if not output.startswith(b"SSID: ", line_start, eol):
+            continue
+        sep = output.find(b", Security: ", line_start + 6, eol)
+        if sep < 0:
+            continue
+        ssid = output[line_start + 6:sep].strip()
+        if not ssid or (skip_status and ssid.startswith(b"(")):
+            continue
+        security_start = sep + 12
+        security_end = output.find(b",", security_start, eol)
+        if security_end < 0:
+            security_end = eol
+        yield _text(ssid), _text(output[security_start:security_end].strip())
+
+# Public DNS servers whose TCP port 53 check_internet_connectivity probes
+_CONNECTIVITY_ADDRESSES = (
+    ("8.8.8.8", 53),         # Google DNS
+    ("1.1.1.1", 53),         # Cloudflare DNS
+    ("208.67.222.222", 53),  # OpenDNS
+)
+
+# Network cache snapshot before the first scan or after clear_cache
+_EMPTY_SNAPSHOT = (None, None, None)
+
+def _serialized(method):
+    """Run a WiFiConnectWrapper method while holding the wrapper's _state_lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._state_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class WiFiConnectWrapper:
-    def __init__(self, binary_path="wifi-connect", cache_duration=300):  # 5 minutes default cache
-        """Initialize with path to the wifi-connect binary and cache duration in seconds"""
-        logger.debug(f"Initializing WiFiConnectWrapper with binary_path={binary_path}, cache_duration={cache_duration}")
-        self.binary_path = binary_path
+    def __init__(self, binary_path="wifi-connect", cache_duration=300, status_ttl=0.5):  # 5 minutes default cache
+        """Initialize with path to the wifi-connect binary, cache duration and status TTL in seconds"""
+        logger.debug("Initializing WiFiConnectWrapper with binary_path=%s, cache_duration=%s", binary_path, cache_duration)
+        # Resolve the PATH lookup once instead of in every spawned child
+        resolved = shutil.which(binary_path)
+        if resolved is None:
+            logger.warning("wifi-connect binary '%s' not found; binary commands will fail", binary_path)
+        self.binary_path = resolved or binary_path
         self.cache_duration = cache_duration
-        self._network_cache = None
-        self._cache_timestamp = None
+        # (networks, monotonic timestamp, wall-clock ISO string), replaced as a whole
+        # so readers can take it without locking; _cache_lock only serializes writers
+        self._cache_snapshot = _EMPTY_SNAPSHOT
         self._cache_lock = threading.Lock()
+        # Request threads may change hotspot/connection state concurrently; the
+        # stop/scan/connect/restart sequences must not interleave. Reentrant
+        # because connect() itself calls stop_hotspot()/start_hotspot().
+        self._state_lock = threading.RLock()
+        self._refresh_event = None  # set while a refresh is scanning, see refresh_network_cache
+        self._refresh_thread = None  # background refresh serving stale lists, see _start_background_refresh
+        self.refresh_wait_timeout = 30  # seconds a caller waits on another caller's refresh
+        self._hotspot_cache = (None, 0.0)  # (status, monotonic time it was read)
+        self._hotspot_read_lock = threading.Lock()  # one --check-hotspot run at a time
+        self._connected_cache = (None, None)  # (connected network, monotonic time it was read)
+        self._hotspot_json = (None, None)  # (status, its JSON encoding), see hotspot_status_json
+        self._networks_json = (None, None)  # (networks list, its JSON encoding), see networks_json
+        self._cache_info_json = (None, None, 0.0, None)  # see cache_info_json
+        self._status_ttl = status_ttl  # seconds a hotspot/connection status may be reused
+        # At most this many one-shot binary runs at a time, however many request
+        # threads want one; the rest queue in _run_binary instead of fork-storming
+        self._spawn_slots = threading.BoundedSemaphore(4)
+        self._status_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='status')  # see status_snapshot
+        self._probe_pool = ThreadPoolExecutor(max_workers=len(_CONNECTIVITY_ADDRESSES),
+                                              thread_name_prefix='connectivity')  # see check_internet_connectivity
+        # Bumped by _invalidate_status; a read that started before an invalidation
+        # (another thread changed state meanwhile) is returned but not cached
+        self._status_generation = 0
         self.onkey_enabled = False
         self.wifi_direct = get_wifi_direct_value() == 'true'
-        logger.debug(f"WiFiConnectWrapper initialized - wifi_direct={self.wifi_direct}") 
+        logger.debug("WiFiConnectWrapper initialized - wifi_direct=%s", self.wifi_direct)
 
     def get_wifi_direct(self):
             """Get the wifi-direct status"""
@@ -49,79 +225,196 @@ class WiFiConnectWrapper:
                 # Re-read from file to ensure we have the latest value
                 current_value = get_wifi_direct_value()
                 self.wifi_direct = current_value == 'true'
-                logger.debug(f"WiFi Direct status: {self.wifi_direct} (file value: {current_value})")
+                logger.debug("WiFi Direct status: %s (file value: %s)", self.wifi_direct, current_value)
                 return self.wifi_direct
             except Exception as e:
-                logger.error(f"Error reading wifi-direct status: {e}")
+                logger.error("Error reading wifi-direct status: %s", e)
                 return self.wifi_direct  # Return cached value if file read fails
     
     def set_wifi_direct(self, value):
         """Set the wifi-direct status and update the file"""
-        logger.debug(f"Setting wifi-direct to: {value}")
+        logger.debug("Setting wifi-direct to: %s", value)
         set_wifi_direct_value(value)
         self.wifi_direct = value
-        logger.info(f"WiFi Direct is {'enabled' if self.wifi_direct else 'disabled'}")
+        logger.info("WiFi Direct is %s", 'enabled' if self.wifi_direct else 'disabled')
         print(f"WiFi Direct is {'enabled' if self.wifi_direct else 'disabled'}")
 
     def toggle_onkey(self):
         """Toggle the onkey feature"""
         self.onkey_enabled = not self.onkey_enabled
         print(f"OnKey is {'enabled' if self.onkey_enabled else 'disabled'}")
+
+    def _run_binary(self, *args, timeout=None):
+        """Run the wifi-connect binary once and return its raw stdout bytes.
+
+        All one-shot binary invocations go through here so the spawn strategy
+        lives in a single place. Output is kept as bytes; stderr (a few log
+        lines) is always captured, so a failure is diagnosed from the one run,
+        and decoded only when the command fails or times out. Concurrent runs
+        are capped by _spawn_slots.
+        """
+        try:
+            with self._spawn_slots:
+                return subprocess.run(
+                    [self.binary_path, *args],
+                    capture_output=True,
+                    check=True,
+                    bufsize=-1,
+                    timeout=timeout
+                ).stdout
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            if e.stderr:
+                e.stderr = e.stderr.decode('utf-8', 'replace')
+            raise
+    
+    def _wait_for(self, predicate, timeout, initial=0.1, max_interval=0.5):
+        """Poll predicate until it returns something truthy or timeout seconds pass.
+
+        Polls quickly at first, since state usually settles well within a
+        second, then backs off by 1.5x up to max_interval. Returns the
+        predicate's last result, so callers can use what it found.
+        """
+        deadline = time.monotonic() + timeout
+        interval = initial
+        while True:
+            result = predicate()
+            remaining = deadline - time.monotonic()
+            if result or remaining <= 0:
+                return result
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 1.5, max_interval)
+    
+    def hotspot_running(self):
+        """Return True if the binary currently reports the hotspot as running"""
+        return self.check_hotspot_status(force=True).get("running", False)
+    
+    def _connected_network_for(self, ssid):
+        """Return the connected network if it is ssid, otherwise None"""
+        connected = self.list_connected(force=True)
+        if connected and connected.get('ssid') == ssid:
+            return connected
+        return None
     
-    def check_hotspot_status(self):
-        """Check if hotspot is currently running"""
+    def wait_for_connection(self, ssid, timeout):
+        """Wait up to timeout seconds for ssid to be the connected network; return it, or None"""
+        return self._wait_for(lambda: self._connected_network_for(ssid), timeout)
+    
+    def check_hotspot_status(self, force=False):
+        """Check if hotspot is currently running.
+
+        A status read less than _status_ttl seconds ago is reused unless
+        force is set; state-changing methods drop it via _invalidate_status.
+        """
+        status, checked_at = self._hotspot_cache
+        if not force and status is not None and time.monotonic() - checked_at < self._status_ttl:
+            return status
+        # Concurrent misses share one --check-hotspot run: a caller that waited
+        # for the lock finds the status the previous holder just cached
+        with self._hotspot_read_lock:
+            if not force:
+                status, checked_at = self._hotspot_cache
+                if status is not None and time.monotonic() - checked_at < self._status_ttl:
+                    return status
+            now = time.monotonic()
+            generation = self._status_generation
+            status = self._read_hotspot_status()
+            if generation == self._status_generation:
+                self._hotspot_cache = (status, now)
+            return status
+    
+    def hotspot_status_json(self, status=None):
+        """Return a hotspot status (the current one by default) encoded as JSON.
+
+        The encoding is kept with the status object it came from, so it is
+        reused for as long as check_hotspot_status keeps returning that object.
+        """
+        if status is None:
+            status = self.check_hotspot_status()
+        cached_status, encoded = self._hotspot_json
+        if status is not cached_status:
+            encoded = _dumps(status)
+            self._hotspot_json = (status, encoded)
+        return encoded
+    
+    def networks_json(self, networks):
+        """Return a networks list encoded as JSON, reusing the encoding while the
+        same list object (normally the cached scan) is passed in"""
+        cached_networks, encoded = self._networks_json
+        if networks is not cached_networks:
+            encoded = _dumps(networks)
+            self._networks_json = (networks, encoded)
+        return encoded
+    
+    def _invalidate_status(self):
+        """Forget the cached hotspot and connection status after changing either"""
+        self._status_generation += 1
+        self._hotspot_cache = (None, 0.0)
+        self._connected_cache = (None, None)
+    
+    def _read_hotspot_status(self):
+        """Run --check-hotspot and parse its output"""
         logger.debug("Checking hotspot status")
         try:
-            logger.debug(f"Running command: {self.binary_path} --check-hotspot")
-            result = subprocess.run(
-                [self.binary_path, "--check-hotspot"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            logger.debug("Running command: %s --check-hotspot", self.binary_path)
+            output = self._run_binary("--check-hotspot", timeout=_TIMEOUT_STATUS)
             
-            logger.debug(f"Hotspot check output: {result.stdout}")
+            logger.debug("Hotspot check output: %r", output)
             
-            # Parse the output to determine if hotspot is running
-            output = result.stdout
-            if "Hotspot Status: RUNNING" in output:
-                # Extract hotspot details
-                ssid_match = re.search(r'SSID: (.*?)(?:\n|$)', output)
-                gateway_match = re.search(r'Gateway: (.*?)(?:\n|$)', output)
-                interface_match = re.search(r'Interface: (.*?)(?:\n|$)', output)
-                password_match = re.search(r'Password Protected: (.*?)(?:\n|$)', output)
-                uptime_match = re.search(r'Uptime: (.*?)(?:\n|$)', output)
-                
-                status = {
-                    "running": True,
-                    "ssid": ssid_match.group(1).strip() if ssid_match else None,
-                    "gateway": gateway_match.group(1).strip() if gateway_match else None,
-                    "interface": interface_match.group(1).strip() if interface_match else None,
-                    "password_protected": password_match.group(1).strip() == "true" if password_match else False,
-                    "uptime": uptime_match.group(1).strip() if uptime_match else None
-                }
-                logger.debug(f"Hotspot is running: {status}")
-                return status
-            else:
+            # Find the running marker first; the (common) stopped case needs no parsing
+            marker = output.find(b"Hotspot Status: RUNNING")
+            if marker == -1:
                 logger.debug("Hotspot is not running")
                 return {"running": False}
+            
+            # Parse the "Key: value" lines after the marker in one pass
+            fields = _parse_hotspot_fields(output, marker)
+            
+            # Extract hotspot details
+            status = {
+                "running": True,
+                "ssid": _decoded(fields, b"SSID"),
+                "gateway": _decoded(fields, b"Gateway"),
+                "interface": _decoded(fields, b"Interface"),
+                "password_protected": fields.get(b"Password Protected", b"").strip() == b"true",
+                "uptime": _decoded(fields, b"Uptime")
+            }
+            logger.debug("Hotspot is running: %s", status)
+            return status
                 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error checking hotspot status: {e}")
-            logger.error(f"Error output: {e.stderr}")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.error("Error checking hotspot status: %s", e)
+            logger.error("Error output: %s", e.stderr)
             return {"running": False}
     
-    def _is_cache_valid(self):
-        """Check if the network cache is still valid"""
-        if self._network_cache is None or self._cache_timestamp is None:
+    def _is_cache_valid(self, snapshot=None):
+        """Check if the network cache (or the given snapshot of it) is still valid"""
+        networks, timestamp, _ = snapshot or self._cache_snapshot
+        if networks is None or timestamp is None:
             logger.debug("Cache is invalid: cache is None or timestamp is None")
             return False
         
-        cache_age = datetime.now() - self._cache_timestamp
-        is_valid = cache_age < timedelta(seconds=self.cache_duration)
-        logger.debug(f"Cache validity check: age={cache_age.total_seconds():.1f}s, duration={self.cache_duration}s, valid={is_valid}")
+        cache_age = time.monotonic() - timestamp
+        is_valid = cache_age < self.cache_duration
+        logger.debug("Cache validity check: age=%.1fs, duration=%ss, valid=%s", cache_age, self.cache_duration, is_valid)
         return is_valid
     
+    def _store_networks(self, networks):
+        """Replace the cache snapshot with freshly scanned networks; call with _cache_lock held"""
+        self._cache_snapshot = (networks, time.monotonic(), datetime.now().isoformat())
+    
+    def _store_scan(self, networks):
+        """Cache a scan result unless it is an error response; return whether it was cached.
+
+        A failed scan leaves the previous networks (and their age) in place,
+        so callers serving a stale list keep serving it.
+        """
+        if not isinstance(networks, list):
+            logger.warning("Network scan failed, keeping the cached networks: %s", networks.get("error"))
+            return False
+        with self._cache_lock:
+            self._store_networks(networks)
+        return True
+    
     def _create_error_response(self, error_type, message):
         """Create a standardized error response"""
         return {
@@ -137,55 +430,51 @@ class WiFiConnectWrapper:
             return self._create_error_response("battery_low", "Cannot find a WiFi device - battery may be low")
         return None
     
+    def _scan_networks_indexed(self):
+        """Scan for networks and return them as {ssid: network}, one entry per SSID.
+
+        Access points sharing an SSID (multi-BSSID setups) collapse into the
+        first one listed. Raises subprocess.CalledProcessError if the scan fails
+        and subprocess.TimeoutExpired if it does not finish in time.
+        """
+        # Scan for networks
+        logger.debug("Running command: %s --list-networks", self.binary_path)
+        output = self._run_binary("--list-networks", timeout=_TIMEOUT_SCAN)
+        
+        logger.debug("Network scan output: %r", output)
+        
+        networks = {}
+        
+        # Extract the networks section; without it there is nothing to parse
+        networks_start = _section_start(output, b"Available WiFi Networks:")
+        if networks_start < 0:
+            logger.debug("No networks section in scan output")
+            return networks
+        
+        # Parse each network entry
+        # The pattern is "SSID: <name>, Security: <type>"; empty SSIDs and
+        # connected status indicators are skipped by the parser
+        for ssid_clean, security_clean in _parse_network_entries(output, networks_start, skip_status=True):
+            # Skip repeated SSIDs
+            if ssid_clean not in networks:
+                networks[ssid_clean] = {
+                    "ssid": ssid_clean,
+                    "security": security_clean,
+                }
+                logger.debug("Added network: %s (Security: %s)", ssid_clean, security_clean)
+        
+        logger.debug("Total networks found: %s", len(networks))
+        return networks
+    
     def _scan_networks_internal(self):
         """Internal method to actually scan for networks"""
         logger.debug("Scanning for networks internally")
         try:
-            # Scan for networks
-            logger.debug(f"Running command: {self.binary_path} --list-networks")
-            result = subprocess.run(
-                [self.binary_path, "--list-networks"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            
-            logger.debug(f"Network scan output: {result.stdout}")
-            
-            # Parse the output based on the actual format
-            networks = []
-            output = result.stdout
-            
-            # Check if the expected section exists
-            if "Available WiFi Networks:" in output:
-                # Extract the networks section
-                networks_section = output.split("Available WiFi Networks:")[1]
-                
-                # Parse each network entry
-                # The pattern is "SSID: <name>, Security: <type>"
-                network_pattern = re.compile(r'SSID: (.*?), Security: (.*?)(?:,|$)', re.MULTILINE)
-                matches = network_pattern.findall(networks_section)
-                
-                logger.debug(f"Found {len(matches)} network matches")
-                
-                for ssid, security in matches:
-                    # Skip empty lines and connected status indicators
-                    ssid_clean = ssid.strip()
-                    security_clean = security.strip()
-                    if ssid_clean and not ssid_clean.startswith('('):
-                        network_info = {
-                            "ssid": ssid_clean,
-                            "security": security_clean,
-                        }
-                        networks.append(network_info)
-                        logger.debug(f"Added network: {ssid_clean} (Security: {security_clean})")
+            return list(self._scan_networks_indexed().values())
             
-            logger.debug(f"Total networks found: {len(networks)}")
-            return networks
-            
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error scanning networks: {e}")
-            logger.error(f"Error output: {e.stderr}")
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            logger.error("Error scanning networks: %s", e)
+            logger.error("Error output: %s", e.stderr)
             
             # Check for WiFi device error first
             wifi_error = self._handle_wifi_device_error(e)
@@ -194,204 +483,286 @@ class WiFiConnectWrapper:
             
             return self._create_error_response("scan_failed", f"Failed to scan networks: {e}")
     
-    def _refresh_network_cache(self, force_rescan=False):
-        """Refresh the network cache by temporarily stopping hotspot if needed"""
-        logger.debug(f"Refreshing network cache (force_rescan={force_rescan})")
+    def refresh_network_cache(self, force_rescan=False, allow_stale=False):
+        """Refresh the network cache by temporarily stopping hotspot if needed.
+
+        Concurrent callers share a single refresh: the first one scans, the
+        others wait for it and return the networks it cached. With allow_stale,
+        an expired but non-empty cache is returned at once while the refresh
+        runs in the background, so only a cold cache blocks the caller.
+        """
+        logger.debug("Refreshing network cache (force_rescan=%s, allow_stale=%s)", force_rescan, allow_stale)
+        # A valid snapshot is returned without taking the writers' lock
+        snapshot = self._cache_snapshot
+        if not force_rescan and self._is_cache_valid(snapshot):
+            logger.debug("Using valid cached network data")
+            return snapshot[0]
+        
         with self._cache_lock:
-            # If cache is valid and we're not forcing a rescan, return cached data
-            if not force_rescan and self._is_cache_valid():
+            # Check again under the lock: another caller may have just refreshed it
+            snapshot = self._cache_snapshot
+            if not force_rescan and self._is_cache_valid(snapshot):
                 logger.debug("Using valid cached network data")
-                return self._network_cache
-            
-            logger.info("Refreshing network cache...")
-            print("Refreshing network cache...", file=sys.stderr)
+                return snapshot[0]
             
-            hotspot_was_running = False
-            hotspot_info = None
+            if allow_stale and snapshot[0]:
+                self._start_background_refresh()
+                return snapshot[0]
             
-            try:
-                # Check if hotspot is running
-                hotspot_status = self.check_hotspot_status()
-                if hotspot_status.get("running", False):
-                    hotspot_was_running = True
-                    hotspot_info = hotspot_status
-                    logger.info("Hotspot is running, temporarily stopping to scan networks...")
-                    print("Hotspot is running, temporarily stopping to scan networks...", file=sys.stderr)
-                    
-                    # Stop hotspot to allow scanning
-                    if not self.stop_hotspot():
-                        logger.error("Failed to stop hotspot for scanning")
-                        print("Failed to stop hotspot for scanning", file=sys.stderr)
-                        return self._network_cache or []
-                    
-                    # Wait a moment for the interface to be available
-                    logger.debug("Waiting 3 seconds for interface to be available")
-                    time.sleep(3)
-                
-                # Now scan for networks
-                networks = self._scan_networks_internal()
-                
-                # Update cache
-                self._network_cache = networks
-                self._cache_timestamp = datetime.now()
+            refresh_event = self._refresh_event
+            if refresh_event is None:
+                self._refresh_event = threading.Event()
+        
+        if refresh_event is not None:
+            logger.debug("Network refresh already in progress, waiting for it")
+            refresh_event.wait(timeout=self.refresh_wait_timeout)
+            return self._cache_snapshot[0] or []
+        
+        try:
+            return self._scan_with_hotspot_paused()
+        finally:
+            with self._cache_lock:
+                refresh_event, self._refresh_event = self._refresh_event, None
+            refresh_event.set()
+    
+    def _start_background_refresh(self):
+        """Rescan in a daemon thread unless a refresh is already running; call with _cache_lock held"""
+        if self._refresh_event is not None or (self._refresh_thread and self._refresh_thread.is_alive()):
+            return
+        logger.debug("Serving stale network list, refreshing in the background")
+        self._refresh_thread = threading.Thread(target=self.refresh_network_cache, args=(True,), daemon=True)
+        self._refresh_thread.start()
+    
+    @_serialized
+    def _scan_with_hotspot_paused(self):
+        """Scan for networks, stopping and restarting the hotspot around the scan if it is running"""
+        logger.info("Refreshing network cache...")
+        print("Refreshing network cache...", file=sys.stderr)
+        
+        hotspot_was_running = False
+        hotspot_info = None
+        
+        try:
+            # Check if hotspot is running
+            hotspot_status = self.check_hotspot_status()
+            if hotspot_status.get("running", False):
+                hotspot_was_running = True
+                hotspot_info = hotspot_status
+                logger.info("Hotspot is running, temporarily stopping to scan networks...")
+                print("Hotspot is running, temporarily stopping to scan networks...", file=sys.stderr)
                 
-                logger.info(f"Network cache updated with {len(networks)} networks")
-                print(f"Network cache updated with {len(networks)} networks", file=sys.stderr)
+                # Stop hotspot to allow scanning
+                if not self.stop_hotspot():
+                    logger.error("Failed to stop hotspot for scanning")
+                    print("Failed to stop hotspot for scanning", file=sys.stderr)
+                    return self._cache_snapshot[0] or []
                 
+                # Wait (up to 3 seconds) until the interface is released
+                logger.debug("Waiting for hotspot to stop before scanning")
+                self._wait_for(lambda: not self.hotspot_running(), 3)
+            
+            # Now scan for networks
+            networks = self._scan_networks_internal()
+            if not self._store_scan(networks):
                 return networks
-                
-            finally:
-                # Restart hotspot if it was running before
-                if hotspot_was_running:
-                    logger.info("Restarting hotspot...")
-                    print("Restarting hotspot...", file=sys.stderr)
-                    if not self.start_hotspot():
-                        logger.error("Failed to restart hotspot after scanning")
-                        print("Failed to restart hotspot after scanning", file=sys.stderr)
-                    else:
-                        logger.info("Hotspot restarted successfully")
-                        print("Hotspot restarted successfully", file=sys.stderr)
-    
+            
+            logger.info("Network cache updated with %s networks", len(networks))
+            print(f"Network cache updated with {len(networks)} networks", file=sys.stderr)
+            
+            return networks
+            
+        finally:
+            # Restart hotspot if it was running before
+            if hotspot_was_running:
+                logger.info("Restarting hotspot...")
+                print("Restarting hotspot...", file=sys.stderr)
+                if not self.start_hotspot():
+                    logger.error("Failed to restart hotspot after scanning")
+                    print("Failed to restart hotspot after scanning", file=sys.stderr)
+                else:
+                    logger.info("Hotspot restarted successfully")
+                    print("Hotspot restarted successfully", file=sys.stderr)
+
     def list_networks(self, use_cache=False):
             """List available WiFi networks, using cache when hotspot is running"""
             if self.wifi_direct:
                 return []  # Return empty list instead of error tuple
             
-            networks = self._scan_networks_internal()
-            if use_cache and self._network_cache is not None:
-                # Use cached networks if available
-                return self._network_cache
+            cached = self._cache_snapshot[0]
+            if use_cache and cached is not None:
+                # Use cached networks if available, without scanning
+                return cached
             
+            networks = self._scan_networks_internal()
             # Update cache even when hotspot is not running
-            with self._cache_lock:
-                self._network_cache = networks
-                self._cache_timestamp = datetime.now()
+            self._store_scan(networks)
             
             return networks
     
     def get_cache_info(self):
         """Get information about the network cache"""
-        with self._cache_lock:
-            if self._cache_timestamp is None:
-                return {
-                    "cached": False,
-                    "cache_age": None,
-                    "cache_valid": False,
-                    "networks_count": 0
-                }
-            
-            cache_age = (datetime.now() - self._cache_timestamp).total_seconds()
+        snapshot = self._cache_snapshot
+        networks, timestamp, wall_time = snapshot
+        if timestamp is None:
             return {
-                "cached": True,
-                "cache_age": cache_age,
-                "cache_valid": self._is_cache_valid(),
-                "networks_count": len(self._network_cache or []),
-                "cache_timestamp": self._cache_timestamp.isoformat()
+                "cached": False,
+                "cache_age": None,
+                "cache_valid": False,
+                "stale": False,
+                "networks_count": 0
             }
+        
+        cache_age = time.monotonic() - timestamp
+        cache_valid = self._is_cache_valid(snapshot)
+        return {
+            "cached": True,
+            "cache_age": cache_age,
+            "cache_valid": cache_valid,
+            # Expired, or about to be replaced by a refresh that is still running
+            "stale": not cache_valid or self._refresh_event is not None,
+            "networks_count": len(networks or []),
+            "cache_timestamp": wall_time
+        }
+    
+    def cache_info_json(self, max_age):
+        """Return get_cache_info() encoded as JSON.
+
+        The encoding is reused while the cache snapshot and any refresh in
+        flight are unchanged, for at most max_age seconds since cache_age
+        keeps moving.
+        """
+        snapshot, refresh_event = self._cache_snapshot, self._refresh_event
+        cached_snapshot, cached_event, built_at, encoded = self._cache_info_json
+        now = time.monotonic()
+        if snapshot is not cached_snapshot or refresh_event is not cached_event or now - built_at >= max_age:
+            encoded = _dumps(self.get_cache_info())
+            self._cache_info_json = (snapshot, refresh_event, now, encoded)
+        return encoded
     
     def clear_cache(self):
         """Clear the network cache"""
         with self._cache_lock:
-            self._network_cache = None
-            self._cache_timestamp = None
+            self._cache_snapshot = _EMPTY_SNAPSHOT
         print("Network cache cleared", file=sys.stderr)
     
+    @_serialized
     def start_hotspot(self):
         """Start the hotspot"""
         try:
-            # Start hotspot in background (non-blocking)
+            self._invalidate_status()
+            # Start hotspot in background (non-blocking). Nothing reads its
+            # output, so it must not go to pipes that could fill up and stall it
             wifi_connect_args = os.getenv('WIFI_CONNECT_ARGS', '').split()
-            process = subprocess.Popen(
+            subprocess.Popen(
                 [self.binary_path, "--start-hotspot"] + wifi_connect_args,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
             )
             
-            # Give it a moment to start
-            time.sleep(2)
-            
-            # Check if it started successfully
-            status = self.check_hotspot_status()
-            return status.get("running", False)
+            # Check if it started successfully, giving it up to 2 seconds
+            return self._wait_for(self.hotspot_running, 2)
             
         except Exception as e:
             print(f"Error starting hotspot: {e}", file=sys.stderr)
             return False
     
+    @_serialized
     def stop_hotspot(self):
         """Stop the hotspot"""
         try:
-            subprocess.run(
-                [self.binary_path, "--stop-hotspot"],
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            self._run_binary("--stop-hotspot", timeout=_TIMEOUT_STOP)
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error stopping hotspot: {e}", file=sys.stderr)
             return False
+        finally:
+            self._invalidate_status()
     
+    @_serialized
     def restart_hotspot(self):
         """Restart the hotspot"""
         try:
-            subprocess.run(
-                [self.binary_path, "--restart-hotspot"],
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            self._run_binary("--restart-hotspot", timeout=_TIMEOUT_START)
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error restarting hotspot: {e}", file=sys.stderr)
             return False
+        finally:
+            self._invalidate_status()
     
-    def list_connected(self):
-        """List currently connected WiFi network using the binary"""
+    def list_connected(self, force=False):
+        """List currently connected WiFi network using the binary.
+
+        Cached like check_hotspot_status: a result less than _status_ttl
+        seconds old is reused unless force is set.
+        """
         if self.wifi_direct:
             return None  # Return None instead of error tuple
-            
+        
+        connected, checked_at = self._connected_cache
+        now = time.monotonic()
+        if not force and checked_at is not None and now - checked_at < self._status_ttl:
+            return connected
+        generation = self._status_generation
+        connected = self._read_connected()
+        if generation == self._status_generation:
+            self._connected_cache = (connected, now)
+        return connected
+    
+    def status_snapshot(self):
+        """Return (connected network, hotspot status) for callers that need both.
+
+        The binary runs one command per process, so the two reads cannot share
+        a spawn; when the connection status is not cached its --list-connected
+        run goes to a helper thread while --check-hotspot runs here, and the
+        two overlap instead of running back to back.
+        """
+        _, checked_at = self._connected_cache
+        if self.wifi_direct or (checked_at is not None and time.monotonic() - checked_at < self._status_ttl):
+            return self.list_connected(), self.check_hotspot_status()
+        connected = self._status_pool.submit(self.list_connected)
+        hotspot_status = self.check_hotspot_status()
+        return connected.result(), hotspot_status
+    
+    def _read_connected(self):
+        """Run --list-connected and parse its output"""
         try:
-            result = subprocess.run(
-                [self.binary_path, "--list-connected"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            output = self._run_binary("--list-connected", timeout=_TIMEOUT_STATUS)
             
-            # Parse the output to extract connected network info
-            output = result.stdout
+            # Extract the connected network section; "No network connected"
+            # and empty output have neither marker
+            connected_section = _connected_section(output)
+            if connected_section is None:
+                return None
             
-            if "Connected Network:" in output or "Connected:" in output:
-                # Extract the connected network section
-                if "Connected Network:" in output:
-                    connected_section = output.split("Connected Network:")[1]
-                else:
-                    connected_section = output.split("Connected:")[1]
-                
-                # Parse the connected network information
-                ssid_match = re.search(r'SSID: (.*?)(?:,|$)', connected_section, re.MULTILINE)
-                security_match = re.search(r'Security: (.*?)(?:,|$)', connected_section, re.MULTILINE)
-                signal_match = re.search(r'Signal: (\d+)%', connected_section)
-                interface_match = re.search(r'Interface: (.*?)(?:,|$)', connected_section, re.MULTILINE)
-                ip_match = re.search(r'IP: (.*?)(?:,|\n|$)', connected_section, re.MULTILINE)
-                
-                if ssid_match:
-                    connected_network = {
-                        "ssid": ssid_match.group(1).strip(),
-                        "security": security_match.group(1).strip() if security_match else "unknown",
-                        "signal_strength": int(signal_match.group(1)) if signal_match else 0,
-                        "interface": interface_match.group(1).strip() if interface_match else "unknown",
-                        "ip_address": ip_match.group(1).strip() if ip_match else None
+            # Fast path: "SSID: .., Security: .., Signal: N%, Interface: .., IP: .." on one line
+            for line in connected_section.splitlines():
+                if line.startswith(b"SSID: "):
+                    fields = _parse_kv_line(line)
+                    signal = fields.get(b"Signal", b"").strip().rstrip(b"%")
+                    return {
+                        "ssid": _decoded(fields, b"SSID", ""),
+                        "security": _decoded(fields, b"Security", "unknown"),
+                        "signal_strength": int(signal) if signal.isdigit() else 0,
+                        "interface": _decoded(fields, b"Interface", "unknown"),
+                        "ip_address": _decoded(fields, b"IP")
                     }
-                    return connected_network
-                    
-            elif "No network connected" in output or "Not connected" in output or output.strip() == "":
+            
+            # Slow path: collect every field in one pass; the first occurrence wins
+            fields = _first_fields(_CONNECTED_FIELDS_RE, connected_section)
+            if b"SSID" not in fields:
                 return None
+            signal = fields.get(b"Signal", b"").strip().rstrip(b"%")
             
-            return None
-        except subprocess.CalledProcessError as e:
+            connected_network = {
+                "ssid": _decoded(fields, b"SSID"),
+                "security": _decoded(fields, b"Security", "unknown"),
+                "signal_strength": int(signal) if signal.isdigit() else 0,
+                "interface": _decoded(fields, b"Interface", "unknown"),
+                "ip_address": _decoded(fields, b"IP")
+            }
+            return connected_network
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error listing connected network: {e}", file=sys.stderr)
             print(f"Error output: {e.stderr}", file=sys.stderr)
             
@@ -408,84 +779,71 @@ class WiFiConnectWrapper:
             return []  # Return empty list instead of error tuple
             
         try:
-            result = subprocess.run(
-                [self.binary_path, "--list-saved"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            output = self._run_binary("--list-saved", timeout=_TIMEOUT_STATUS)
             
-            # Parse the output based on the actual format
-            networks = []
-            output = result.stdout
-            
-            # Check if the expected section exists
-            if "Saved WiFi Networks:" in output:
-                # Extract the saved networks section
-                networks_section = output.split("Saved WiFi Networks:")[1]
-                
-                # Parse each saved network entry
-                network_pattern = re.compile(r'SSID: (.*?), Security: (.*?)(?:,|$)', re.MULTILINE)
-                matches = network_pattern.findall(networks_section)
-                
-                for ssid, security in matches:
-                    ssid_clean = ssid.strip()
-                    security_clean = security.strip()
-                    if ssid_clean:
-                        networks.append({
-                            "ssid": ssid_clean,
-                            "security": security_clean,
-                        })
-            elif "No saved networks found" in output:
+            # Extract the saved networks section; "No saved networks found" has none
+            networks_start = _section_start(output, b"Saved WiFi Networks:")
+            if networks_start < 0:
                 return []
             
-            return networks
-        except subprocess.CalledProcessError as e:
+            # Parse each saved network entry
+            return [
+                {"ssid": ssid_clean, "security": security_clean}
+                for ssid_clean, security_clean in _parse_network_entries(output, networks_start)
+            ]
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error listing saved networks: {e}", file=sys.stderr)
             print(f"Error output: {e.stderr}", file=sys.stderr)
             return []
  
-    def check_internet_connectivity(self, interface=None, timeout=5):
-        """Check if we have actual internet connectivity by pinging reliable servers"""
-        test_hosts = [
-            "8.8.8.8",      # Google DNS
-            "1.1.1.1",      # Cloudflare DNS  
-            "208.67.222.222" # OpenDNS
-        ]
-        
-        for host in test_hosts:
-            try:
-                # Build ping command
-                cmd = ["ping", "-c", "1", "-W", str(timeout)]
+    def _probe_host(self, address, device, timeout):
+        """TCP connect to a (host, port) address, optionally bound to device; True if it answers.
+
+        device is the SO_BINDTODEVICE value (NUL-terminated interface name) or None.
+        """
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.settimeout(timeout)
                 
                 # If interface is specified, bind to that interface
-                if interface:
-                    cmd.extend(["-I", interface])
-                
-                cmd.append(host)
-                
-                # Run ping command
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout + 2
-                )
+                if device:
+                    try:
+                        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, device)
+                    except OSError as e:
+                        print(f"Could not bind connectivity check to {device[:-1].decode()}: {e}", file=sys.stderr)
                 
-                if result.returncode == 0:
-                    print(f"Internet connectivity confirmed via {host}", file=sys.stderr)
-                    return True
-                    
-            except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
-                print(f"Failed to ping {host}: {e}", file=sys.stderr)
-                continue
+                sock.connect(address)
+            return True
+        except OSError as e:
+            print(f"Failed to reach {address[0]}: {e}", file=sys.stderr)
+            return False
+
+    def check_internet_connectivity(self, interface=None, timeout=2):
+        """Check if we have actual internet connectivity with a TCP connect to public DNS servers.
+
+        All hosts are tried at once on the wrapper's probe pool and the first
+        success wins, so an unreachable host costs at most one timeout rather
+        than one each. Slower probes are left to end by their own timeout; the
+        pool's fixed threads are reused by the next check.
+        """
+        # Built once per check and shared by every probe
+        device = interface.encode() + b"\0" if interface else None
+        
+        futures = {
+            self._probe_pool.submit(self._probe_host, address, device, timeout): address[0]
+            for address in _CONNECTIVITY_ADDRESSES
+        }
+        for future in as_completed(futures):
+            if future.result():
+                print(f"Internet connectivity confirmed via {futures[future]}", file=sys.stderr)
+                return True
         
         print("No internet connectivity detected", file=sys.stderr)
         return False
 
     def _ensure_connectivity(self):
         """Helper method to start hotspot if no real internet connection exists"""
-        connected = self.list_connected()
+        connected = self.list_connected(force=True)
         
         if not connected:
             print("No WiFi network connected, starting hotspot...", file=sys.stderr)
@@ -506,36 +864,34 @@ class WiFiConnectWrapper:
         else:
             print(f"Connected to '{connected['ssid']}' with internet access.", file=sys.stderr)
 
+    @_serialized
     def forget_network(self, ssid):
         """Forget a specific WiFi network using the binary"""
         if self.wifi_direct:
             return False  # Return False instead of error tuple
             
         try:
-            subprocess.run(
-                [self.binary_path, "--forget-network", ssid],
-                check=True
-            )
+            self._run_binary("--forget-network", ssid, timeout=_TIMEOUT_FORGET)
             
             # Check connectivity and start hotspot if needed
             self._ensure_connectivity()
             
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error forgetting network '{ssid}': {e}", file=sys.stderr)
-            print(f"Error output: {e.stderr if hasattr(e, 'stderr') else ''}", file=sys.stderr)
+            print(f"Error output: {e.stderr or ''}", file=sys.stderr)
             return False
+        finally:
+            self._invalidate_status()
 
+    @_serialized
     def forget_all(self):
         """Forget all saved WiFi networks using the binary"""
         if self.wifi_direct:
             return False  # Return False instead of error tuple
             
         try:
-            subprocess.run(
-                [self.binary_path, "--forget-all"],
-                check=True
-            )
+            self._run_binary("--forget-all", timeout=_TIMEOUT_FORGET)
             
             # After forgetting all networks, start hotspot immediately
             print("All networks forgotten, starting hotspot...", file=sys.stderr)
@@ -545,20 +901,24 @@ class WiFiConnectWrapper:
                 print("Failed to start hotspot.", file=sys.stderr)
             
             return True
-        except subprocess.CalledProcessError as e:
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
             print(f"Error forgetting networks: {e}", file=sys.stderr)
-            print(f"Error output: {e.stderr if hasattr(e, 'stderr') else ''}", file=sys.stderr)
+            print(f"Error output: {e.stderr or ''}", file=sys.stderr)
             return False
+        finally:
+            self._invalidate_status()
 
+    @_serialized
     def connect(self, ssid, passphrase=None):
         """Connect to a WiFi network using the binary with proper hotspot management"""
-        logger.info(f"Attempting to connect to '{ssid}' (passphrase provided: {passphrase is not None})")
+        logger.info("Attempting to connect to '%s' (passphrase provided: %s)", ssid, passphrase is not None)
         if self.wifi_direct:
             logger.warning("Connection attempt blocked - WiFi Direct mode is active")
             return False  # Return False instead of error tuple
             
         hotspot_was_running = False
         hotspot_info = None
+        connected_network = None
         
         try:
             # Step 1: Check if hotspot is running and stop it if needed
@@ -575,20 +935,14 @@ class WiFiConnectWrapper:
                     print("Failed to stop hotspot for connection", file=sys.stderr)
                     return False
                 
-                # Wait for the interface to be available and verify hotspot is stopped
-                logger.debug("Waiting 3 seconds for interface to be available")
-                time.sleep(3)
-                
-                # Double-check that hotspot is actually stopped
-                verify_status = self.check_hotspot_status()
-                if verify_status.get("running", False):
+                # Wait (up to 3 seconds) for the hotspot to report stopped
+                logger.debug("Waiting for hotspot to stop")
+                if not self._wait_for(lambda: not self.hotspot_running(), 3):
                     logger.warning("Hotspot still running after stop command, trying again...")
                     print("Hotspot still running after stop command, trying again...", file=sys.stderr)
                     self.stop_hotspot()
-                    time.sleep(3)
                     
-                    final_verify = self.check_hotspot_status()
-                    if final_verify.get("running", False):
+                    if not self._wait_for(lambda: not self.hotspot_running(), 3):
                         logger.error("Failed to stop hotspot completely")
                         print("Failed to stop hotspot completely", file=sys.stderr)
                         return False
@@ -598,14 +952,10 @@ class WiFiConnectWrapper:
             
             # Step 2: Scan networks to ensure the target network is available
             print("Scanning for available networks...", file=sys.stderr)
-            available_networks = self._scan_networks_internal()
+            available_networks = self._scan_networks_indexed()
             
             # Check if the target network is available
-            target_network = None
-            for network in available_networks:
-                if network['ssid'] == ssid:
-                    target_network = network
-                    break
+            target_network = available_networks.get(ssid)
             
             if not target_network:
                 print(f"Warning: Network '{ssid}' not found in scan results", file=sys.stderr)
@@ -615,25 +965,20 @@ class WiFiConnectWrapper:
             
             # Step 3: Attempt to connect
             print(f"Connecting to '{ssid}'...", file=sys.stderr)
-            cmd = [self.binary_path, "--connect", ssid]
+            cmd = ["--connect", ssid]
             if passphrase:
                 cmd.extend(["--passphrase", passphrase])
             
-            # Run the connection command
-            result = subprocess.run(
-                cmd, 
-                check=True,
-                capture_output=True,
-                text=True,
-                timeout=30  # 30 second timeout for connection attempts
-            )
-            
-            # Wait a moment for the connection to establish
-            time.sleep(5)
+            # Run the connection command (bounded by _TIMEOUT_CONNECT)
+            try:
+                self._run_binary(*cmd, timeout=_TIMEOUT_CONNECT)
+            finally:
+                self._invalidate_status()
             
-            # Step 4: Verify the connection was successful
-            connected_network = self.list_connected()
-            if connected_network and connected_network['ssid'] == ssid:
+            # Step 4: Verify the connection was successful, waiting up to
+            # 5 seconds for it to establish
+            connected_network = self.wait_for_connection(ssid, 5)
+            if connected_network:
                 print(f"Successfully connected to '{ssid}'", file=sys.stderr)
                 if connected_network.get('ip_address'):
                     print(f"IP Address: {connected_network['ip_address']}", file=sys.stderr)
@@ -659,17 +1004,15 @@ class WiFiConnectWrapper:
         
         finally:
             # Step 5: Restart hotspot if connection failed and hotspot was running before
-            final_connected = self.list_connected()
-            connection_successful = final_connected and final_connected['ssid'] == ssid
+            # (a connection verified in step 4 needs no second --list-connected run)
+            connection_successful = bool(connected_network or self._connected_network_for(ssid))
             
             if not connection_successful and hotspot_was_running:
                 print("Connection failed, restarting hotspot...", file=sys.stderr)
                 if self.start_hotspot():
                     print("Hotspot restarted successfully after failed connection", file=sys.stderr)
                     # Verify hotspot actually started
-                    time.sleep(3)
-                    verify_hotspot = self.check_hotspot_status()
-                    if verify_hotspot.get("running", False):
+                    if self._wait_for(self.hotspot_running, 3):
                         print("Hotspot restart verified", file=sys.stderr)
                     else:
                         print("Hotspot restart verification failed", file=sys.stderr)
@@ -678,376 +1021,707 @@ class WiFiConnectWrapper:
             elif connection_successful:
                 print(f"Connected successfully to '{ssid}', hotspot remains off", file=sys.stderr)
 
+_STATIC_ROOT = os.path.realpath(os.path.join('ui', 'public', 'static'))
+_STATIC_CACHE_MAX_BYTES = 256 * 1024  # larger assets are streamed with sendfile
+
+@functools.lru_cache(maxsize=128)
+def _read_static_file(path, mtime_ns):
+    """Read a small static asset; mtime_ns is part of the key so edits are picked up"""
+    with open(path, 'rb') as f:
+        return f.read()
+
+@functools.lru_cache(maxsize=1)
+def _render_index(mtime_ns):
+    """Build the complete index.html response and its ETag and 304 counterpart, once per file version.
+
+    The keyboard scripts are added in touchscreen mode; the ETag covers the
+    rendered length, so the two variants never share one.
+    """
+    with open('index.html', 'r') as f:
+        content = f.read()
+    if touchscreen == '1':
+        logger.debug("Touchscreen mode enabled, adding keyboard scripts")
+        content = content.replace('<!-- kioskboard -->', '<script src="./ui/public/static/js/kioskboard-aio.min.js"></script>')
+        content = content.replace('<!-- keyboard -->', '<script src="./ui/public/static/js/keyboard.js"></script>')
+    body = content.encode('utf-8')
+    etag = f'W/"{mtime_ns:x}-{len(body):x}"'
+    # no-cache: browsers keep the page but revalidate it on every load
+    validators = f"ETag: {etag}\r\nCache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n\r\n"
+    response = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-type: text/html\r\n"
+        f"Content-Length: {len(body)}\r\n" + validators
+    ).encode('latin-1') + body
+    return etag, response, ("HTTP/1.1 304 Not Modified\r\n" + validators).encode('latin-1')
+
+@functools.lru_cache(maxsize=128)
+def _static_heads(path, mtime_ns, size, max_age):
+    """Return the ETag and complete 200 and 304 header blocks for one version of a static asset"""
+    etag = f'W/"{mtime_ns:x}-{size:x}"'
+    validators = (
+        f"ETag: {etag}\r\n"
+        f"Last-Modified: {email.utils.formatdate(mtime_ns / 1e9, usegmt=True)}\r\n"
+        f"Cache-Control: public, max-age={max_age}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "\r\n"
+    )
+    head = (
+        "HTTP/1.1 200 OK\r\n"
+        f"Content-type: {_guess_mime_type(path)}\r\n"
+        f"Content-Length: {size}\r\n"
+    ) + validators
+    return etag, head.encode('latin-1'), ("HTTP/1.1 304 Not Modified\r\n" + validators).encode('latin-1')
+
+_MIME_TYPES = {}  # file extension -> content type
+
+def _guess_mime_type(path):
+    """Guess a file's content type, remembering the answer per extension"""
+    ext = os.path.splitext(path)[1]
+    mime_type = _MIME_TYPES.get(ext)
+    if mime_type is None:
+        mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        _MIME_TYPES[ext] = mime_type
+    return mime_type
+
+@functools.lru_cache(maxsize=None)
+def _head_prefix(status_code, content_type='application/json', keep_alive=True, gzipped=False):
+    """Status line and fixed headers up to the Content-Length value, built once per combination"""
+    reason = BaseHTTPRequestHandler.responses[status_code][0]
+    return (
+        f"HTTP/1.1 {status_code} {reason}\r\n"
+        f"Content-type: {content_type}\r\n"
+        + ("Content-Encoding: gzip\r\nVary: Accept-Encoding\r\n" if gzipped else "") +
+        "Access-Control-Allow-Origin: *\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "Content-Length: "
+    ).encode('latin-1')
+
+# The head of the common case, looked up without going through the cache
+_JSON_OK_HEAD = _head_prefix(200)
+
+def _dumps_with(payload, key, encoded):
+    """Encode payload with an already encoded member appended as its last key"""
+    head = _dumps(payload)[:-1]
+    return b"".join((head, b"," if len(head) > 1 else b"", _dumps(key), b":", encoded, b"}"))
+
+def _dumps_members(*members):
+    """Encode a JSON object from (key, already encoded value) pairs, keeping their order"""
+    return b"{" + b",".join(_dumps(key) + b":" + encoded for key, encoded in members) + b"}"
+
+# List responses larger than this are gzipped for clients that accept it
+_GZIP_MIN_BYTES = 512
+
+@functools.lru_cache(maxsize=64)
+def _accepts_gzip(accept_encoding):
+    """Return True if an Accept-Encoding value allows gzip (RFC 9110 section 12.5.3).
+
+    An explicit gzip (or x-gzip) entry decides, otherwise a "*" entry does;
+    q=0 marks a coding as refused. Clients send a handful of distinct
+    values, so the answer is remembered per header value.
+    """
+    wildcard = False
+    for entry in accept_encoding.lower().split(','):
+        coding, *params = entry.split(';')
+        coding = coding.strip()
+        if coding not in ('gzip', 'x-gzip', '*'):
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding != '*':
+            return q > 0
+        wildcard = q > 0
+    return wildcard
+
+# Every POST body is a small JSON object ({"ssid": .., "passphrase": ..} at most)
+_MAX_POST_BYTES = 4096
+
+# Pre-encoded bodies for responses whose content never changes
+def _options_response(keep_alive):
+    """Complete CORS preflight response; browsers may reuse it for Access-Control-Max-Age seconds"""
+    return (
+        "HTTP/1.1 200 OK\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+        "Access-Control-Allow-Headers: Content-Type\r\n"
+        "Access-Control-Max-Age: 600\r\n"
+        "Content-Length: 0\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode('latin-1')
+
+_OPTIONS_RESPONSE = _options_response(True)
+_OPTIONS_CLOSE = _options_response(False)
+
+_OK_TRUE = _dumps({"success": True})
+_OK_FALSE = _dumps({"success": False})
+_ERR_NOT_FOUND = _dumps({"error": "Not found"})
+_ERR_METHOD_NOT_ALLOWED = _dumps({"error": "Method not allowed"})
+_ERR_FILE_NOT_FOUND = _dumps({"error": "File not found"})
+_ERR_INVALID_JSON = _dumps({"error": "Invalid JSON"})
+_ERR_SSID_REQ = _dumps({"error": "SSID is required"})
+_ERR_WIFI_DIRECT_FORBIDDEN = _dumps({
+    "success": False,
+    "error": "Operation forbidden in WiFi Direct mode"
+})
+_ERR_INDEX_NOT_FOUND = _dumps({"error": "index.html not found"})
+_ERR_WIFI_DIRECT_STATUS = _dumps({"error": "Failed to get wifi-direct status"})
+_ERR_VALUE_REQ = _dumps({"error": "Value is required"})
+_ERR_INVALID_VALUE = _dumps({"error": "Invalid value. Must be 'true' or 'false'"})
+_VALUE_TRUE = _dumps({"value": True})
+_VALUE_FALSE = _dumps({"value": False})
+# List endpoints answer with fixed empty bodies while WiFi Direct is active
+_DIRECT_NETWORKS = _dumps({
+    "networks": [],
+    "cache_info": {"cached": False, "cache_age": None, "cache_valid": False, "stale": False, "networks_count": 0},
+    "wifi_direct_active": True
+})
+_DIRECT_CONNECTED = _dumps({"connected": None, "wifi_direct_active": True})
+_DIRECT_SAVED = _dumps({"saved_networks": [], "wifi_direct_active": True})
+# /set-wifi-direct success bodies by the only two accepted values
+_WIFI_DIRECT_SET = {
+    value: _dumps({"success": True, "value": value, "message": "Server will restart to apply changes"})
+    for value in ('true', 'false')
+}
+
 class WiFiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections open between polling requests
+    disable_nagle_algorithm = True  # TCP_NODELAY: small responses must not wait for the previous ACK
     wifi_manager = None  
+    response_ttl = 2  # seconds an encoded list response may be reused
+    static_max_age = 3600  # seconds browsers may reuse a static asset without revalidating
+    timeout = 30  # seconds a worker waits on a client that is partway through a request
+    saved_ttl = 30  # seconds for /list-saved, which only changes through POSTs (they drop the cache)
+    _response_cache = {}  # path -> (monotonic timestamp, body, gzipped body or None), least recently used first
+    _response_cache_max = 32  # entries; each distinct query string is its own entry
+    _response_cache_lock = threading.Lock()
     
     def log_message(self, format, *args):
-        """Override to use our logger instead of stderr"""
-        logger.info(f"{self.address_string()} - {format % args}")
+        """Override to use our logger instead of stderr, formatting only if debug logging is on"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s - %s", self.address_string(), format % args)
     
-    def _set_headers(self, status_code=200):
-        logger.debug(f"Setting response headers with status code: {status_code}")
-        self.send_response(status_code)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
+    def log_error(self, format, *args):
+        """Log protocol errors (bad requests, timeouts) at warning level, unlike access lines"""
+        logger.warning("%s - " + format, self.address_string(), *args)
     
-    def do_GET(self):
-        logger.debug(f"GET request: {self.path}")
-        
-        if self.path == '/':
-            # Serve the main HTML file
-            logger.debug("Serving index.html")
-            try:
-                with open('index.html', 'r') as f:
-                    content = f.read()
-                if touchscreen == '1':
-                    logger.debug("Touchscreen mode enabled, adding keyboard scripts")
-                    content = content.replace('<!-- kioskboard -->', '<script src="./ui/public/static/js/kioskboard-aio.min.js"></script>')
-                    content = content.replace('<!-- keyboard -->', '<script src="./ui/public/static/js/keyboard.js"></script>')
-                self.send_response(200)
-                self.send_header('Content-type', 'text/html')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                self.wfile.write(content.encode('utf-8'))
-                logger.debug("Successfully served index.html")
-            except FileNotFoundError:
-                logger.error("index.html not found")
-                self._set_headers(404)
-                self.wfile.write(json.dumps({"error": "index.html not found"}).encode())
-
-
-        elif self.path == '/get-wifi-direct':
-                    try:
-                        wifi_direct_value = self.wifi_manager.get_wifi_direct()
-                        self._set_headers()
-                        self.wfile.write(json.dumps({"value": wifi_direct_value}).encode())
-                    except Exception as e:
-                        print(f"Error getting wifi-direct status: {e}", file=sys.stderr)
-                        self._set_headers(500)
-                        self.wfile.write(json.dumps({"error": "Failed to get wifi-direct status"}).encode())
-
-        elif self.path.startswith('/list-networks'):
-                    logger.info("Handling list-networks request")
-                    # Check if WiFi Direct is enabled
-                    if self.wifi_manager.wifi_direct:
-                        logger.info("WiFi Direct is active, returning empty network list")
-                        self._set_headers()
-                        self.wfile.write(json.dumps({
-                            "networks": [],
-                            "cache_info": {"cached": False, "cache_age": None, "cache_valid": False, "networks_count": 0},
-                            "wifi_direct_active": True
-                        }).encode())
-                        return
-                        
-                    print("Getting network list...", file=sys.stderr)
-                    use_cache = 'use_cache=true' in self.path
-                    logger.debug(f"List networks request - use_cache: {use_cache}")
-
-                    # Check if hotspot is running
-                    hotspot_status = self.wifi_manager.check_hotspot_status()
-                    is_running = hotspot_status.get('running', False)
-                    logger.debug(f"Hotspot running: {is_running}")
-
-                    networks = []
-                    cache_info = {}
-
-                    if use_cache: 
-                        logger.debug("Using cached network list")
-                        networks = self.wifi_manager.list_networks(use_cache=True)
-                        cache_info = self.wifi_manager.get_cache_info()
-                    elif not is_running:
-                        # If the hotspot is not running, simply list networks (new logic)
-                        logger.debug("Hotspot not running, listing networks directly")
-                        networks = self.wifi_manager.list_networks(use_cache=use_cache)
-                        cache_info = self.wifi_manager.get_cache_info()
-                    else:
-                        logger.debug("Hotspot running, stopping to scan networks")
-                        self.wifi_manager.stop_hotspot()
-                        time.sleep(2)
-                        networks = self.wifi_manager.list_networks(use_cache=False) # Force rescan
-                        time.sleep(2)
-                        self.wifi_manager.start_hotspot()
-
-                    logger.info(f"Returning {len(networks)} networks")
-                    self._set_headers()
-                    self.wfile.write(json.dumps({
-                        "networks": networks,
-                        "cache_info": cache_info
-                    }).encode())
-            
-        elif self.path == '/list-networks?refresh=true' or self.path == '/list-networks?force=true':
-            print("Force refreshing network list...", file=sys.stderr)
-            networks = self.wifi_manager.list_networks(force_refresh=True)
+    def handle(self):
+        """Serve requests while the client has more ready; on a server that parks idle
+        connections, return with close_connection unset instead of waiting for the next one"""
+        self.close_connection = True
+        self.handle_one_request()
+        parks = getattr(self.server, 'parks_idle_connections', False)
+        while not self.close_connection and (not parks or self._input_pending()):
+            self.handle_one_request()
+
+    def _input_pending(self):
+        """Return True if another request is already buffered or waiting on the socket"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:  # nothing to read without blocking
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def log_request(self, code='-', size='-'):
+        """Log the access line at debug level, formatting it only if debug logging is on"""
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug('%s - "%s" %s %s', self.address_string(), self.requestline, getattr(code, 'value', code), size)
+    
+    def _write_response(self, body, status_code=200, content_type='application/json', compress=False,
+                        headers=b"", gzipped_body=None):
+        """Write status line, headers and body to the socket with a single write.
+
+        With compress, a body over _GZIP_MIN_BYTES is gzipped (fastest level)
+        when the client accepts it, or replaced by gzipped_body if the caller
+        already has it compressed. headers holds extra raw header lines, each
+        ending in CRLF.
+        """
+        self.log_request(status_code)
+        gzipped = (compress and len(body) > _GZIP_MIN_BYTES
+                   and _accepts_gzip(self.headers.get('Accept-Encoding', '')))
+        if gzipped:
+            body = gzipped_body if gzipped_body is not None else gzip.compress(body, compresslevel=1)
+        # close_connection is set for "Connection: close" and plain HTTP/1.0 requests
+        if status_code == 200 and content_type == 'application/json' and not (self.close_connection or gzipped):
+            head = _JSON_OK_HEAD
+        else:
+            head = _head_prefix(status_code, content_type, not self.close_connection, gzipped)
+        self.wfile.write(b"".join((head, str(len(body)).encode(), b"\r\n", headers, b"\r\n", body)))
+
+    def send_error(self, code, message=None, explain=None):
+        """Answer protocol errors (bad request line, unsupported method) with a JSON
+        body, written together with the headers instead of in separate writes"""
+        self.log_error("code %d, message %s", code, message)
+        self.log_request(code)
+        self.close_connection = True
+        head = _head_prefix(code, keep_alive=False)
+        body = b""
+        if self.command != 'HEAD' and code >= 200 and code not in (204, 304):
+            body = _dumps({"error": message or self.responses.get(code, ("Error",))[0]})
+        self.wfile.write(b"".join((head, str(len(body)).encode(), b"\r\n\r\n", body)))
+
+    def _send_static_file(self, f, st, fs_path):
+        """Send an already opened static asset, answering 304 for a matching ETag.
+
+        Small assets come from an in-memory cache and go out in one write;
+        larger ones are copied to the socket with sendfile.
+        """
+        size = st.st_size
+        etag, head, not_modified = _static_heads(fs_path, st.st_mtime_ns, size, self.static_max_age)
+        if self.headers.get('If-None-Match') == etag:
+            self.log_request(304)
+            self.wfile.write(not_modified)
+            return
+
+        self.log_request(200)
+        if size <= _STATIC_CACHE_MAX_BYTES:
+            self.wfile.write(head + _read_static_file(fs_path, st.st_mtime_ns))
+            return
+
+        # Hold the header back (TCP_CORK) so it leaves with the start of the file
+        # rather than as a small packet of its own, since Nagle is off
+        cork = getattr(socket, 'TCP_CORK', None)
+        if cork is not None:
+            self.connection.setsockopt(socket.IPPROTO_TCP, cork, 1)
+        try:
+            self.wfile.write(head)
+            self._send_file_body(f, size)
+        finally:
+            if cork is not None:
+                self.connection.setsockopt(socket.IPPROTO_TCP, cork, 0)
+
+    def _send_file_body(self, f, size):
+        """Copy size bytes of an open file to the client with sendfile, streaming if it is unavailable"""
+        try:
+            out_fd = self.wfile.fileno()
+        except (AttributeError, OSError):
+            # No socket to sendfile to; stream it in chunks rather than reading it whole
+            shutil.copyfileobj(f, self.wfile, 64 * 1024)
+            return
+        offset = 0
+        try:
+            while offset < size:
+                sent = os.sendfile(out_fd, f.fileno(), offset, size - offset)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if e.errno not in (errno.EINVAL, errno.ENOSYS):
+                raise
+            # The file system does not support sendfile; stream the rest
+            f.seek(offset)
+            shutil.copyfileobj(f, self.wfile, 64 * 1024)
+
+    def _write_json(self, payload, status_code=200, compress=False):
+        """Serialize payload and write it as a JSON response"""
+        self._write_response(_dumps(payload), status_code, compress=compress)
+
+    def _write_cached(self, key, producer, ttl=None):
+        """Write a JSON response, reusing the encoded body while it is younger than ttl
+        (response_ttl by default); the least recently used entry goes once the cache is full.
+
+        A body large enough to be gzipped is compressed once, when its entry is
+        created, so cache hits from gzip clients do no compression.
+        """
+        if ttl is None:
+            ttl = self.response_ttl
+        now = time.monotonic()
+        cache = self._response_cache
+        with self._response_cache_lock:
+            hit = cache.pop(key, None)
+            if hit is not None:
+                cache[key] = hit  # re-insert as most recently used
+        if hit is not None and now - hit[0] < ttl:
+            logger.debug("Serving cached response for %s", key)
+            _, body, gzipped_body = hit
+        else:
+            body = _dumps(producer())
+            gzipped_body = gzip.compress(body, compresslevel=1) if len(body) > _GZIP_MIN_BYTES else None
+            with self._response_cache_lock:
+                cache.pop(key, None)
+                if len(cache) >= self._response_cache_max:
+                    del cache[next(iter(cache))]
+                cache[key] = (now, body, gzipped_body)
+        self._write_response(body, compress=True, gzipped_body=gzipped_body)
+
+    @classmethod
+    def _invalidate_responses(cls):
+        """Drop all cached responses after a state-changing request"""
+        with cls._response_cache_lock:
+            cls._response_cache.clear()
+    
+    def _list_networks_response(self, use_cache):
+        """Build the /list-networks payload, scanning (and bouncing the hotspot) if needed"""
+        print("Getting network list...", file=sys.stderr)
+        logger.debug("List networks request - use_cache: %s", use_cache)
+
+        # Check if hotspot is running
+        hotspot_status = self.wifi_manager.check_hotspot_status()
+        is_running = hotspot_status.get('running', False)
+        logger.debug("Hotspot running: %s", is_running)
+
+        networks = []
+        cache_info = {}
+
+        if use_cache: 
+            logger.debug("Using cached network list")
+            networks = self.wifi_manager.list_networks(use_cache=True)
             cache_info = self.wifi_manager.get_cache_info()
-            self._set_headers()
-            self.wfile.write(json.dumps({
-                "networks": networks,
-                "cache_info": cache_info
-            }).encode())
-        
-        elif self.path == '/cache-info':
+        elif not is_running:
+            # If the hotspot is not running, simply list networks (new logic)
+            logger.debug("Hotspot not running, listing networks directly")
+            networks = self.wifi_manager.list_networks(use_cache=use_cache)
             cache_info = self.wifi_manager.get_cache_info()
-            self._set_headers()
-            self.wfile.write(json.dumps({"cache_info": cache_info}).encode())
-        
-        elif self.path == '/list-connected':
-            # Check if WiFi Direct is enabled
-            if self.wifi_manager.wifi_direct:
-                self._set_headers()
-                self.wfile.write(json.dumps({
-                    "connected": None,
-                    "wifi_direct_active": True
-                }).encode())
-                return
-                
-            connected = self.wifi_manager.list_connected()
-            self._set_headers()
-            self.wfile.write(json.dumps({"connected": connected}).encode())
-             
-        elif self.path == '/list-saved':
-            # Check if WiFi Direct is enabled
-            if self.wifi_manager.wifi_direct:
-                self._set_headers()
-                self.wfile.write(json.dumps({
-                    "saved_networks": [],
-                    "wifi_direct_active": True
-                }).encode())
-                return
-                
-            saved_networks = self.wifi_manager.list_saved()
-            self._set_headers()
-            self.wfile.write(json.dumps({"saved_networks": saved_networks}).encode())
-        
-        elif self.path == '/hotspot-status':
-            status = self.wifi_manager.check_hotspot_status()
-            self._set_headers()
-            self.wfile.write(json.dumps({"hotspot": status}).encode())
-        
-        elif self.path == '/health':
-            # Simple health check endpoint
-            self._set_headers()
-            self.wfile.write(json.dumps({
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat()
-            }).encode())
-        
-        elif self.path == '/connection-status':
-            # Get both connection and hotspot status
-            connected = self.wifi_manager.list_connected()
-            hotspot_status = self.wifi_manager.check_hotspot_status()
-            self._set_headers()
-            self.wfile.write(json.dumps({
-                "connected": connected,
-                "hotspot": hotspot_status,
-                "server_status": "online"
-            }).encode())
-        
-        elif self.path.startswith('/ui/public/static'):
-            rel_path = self.path.removeprefix('/ui/public/static/')
-            fs_path = os.path.join('ui', 'public', 'static', rel_path)
-
-            if os.path.exists(fs_path) and os.path.isfile(fs_path):
-                mime_type, _ = mimetypes.guess_type(fs_path)
-                self.send_response(200)
-                self.send_header('Content-type', mime_type or 'application/octet-stream')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-                with open(fs_path, 'rb') as f:
-                    self.wfile.write(f.read())
+        else:
+            logger.debug("Hotspot running, serving cached networks or stopping it to scan")
+            # A cached list (even expired) is returned at once and refreshed in the
+            # background; concurrent requests share one hotspot stop/scan/restart cycle
+            networks = self.wifi_manager.refresh_network_cache(allow_stale=True)
+            cache_info = self.wifi_manager.get_cache_info()
+
+        logger.info("Returning %s networks", len(networks))
+        return {
+            "networks": networks,
+            "cache_info": cache_info
+        }
+
+    def _handle_index(self, query):
+        # Serve the main HTML file
+        logger.debug("Serving index.html")
+        try:
+            etag, response, not_modified = _render_index(os.stat('index.html').st_mtime_ns)
+            if self.headers.get('If-None-Match') == etag:
+                self.log_request(304)
+                self.wfile.write(not_modified)
             else:
-                self._set_headers(404)
-                self.wfile.write(json.dumps({"error": "File not found"}).encode())
+                self.log_request(200)
+                self.wfile.write(response)
+            logger.debug("Successfully served index.html")
+        except FileNotFoundError:
+            logger.error("index.html not found")
+            self._write_response(_ERR_INDEX_NOT_FOUND, 404)
+
+    def _handle_get_wifi_direct(self, query):
+        try:
+            wifi_direct_value = self.wifi_manager.get_wifi_direct()
+            self._write_response(_VALUE_TRUE if wifi_direct_value else _VALUE_FALSE)
+        except Exception as e:
+            print(f"Error getting wifi-direct status: {e}", file=sys.stderr)
+            self._write_response(_ERR_WIFI_DIRECT_STATUS, 500)
+
+    def _handle_list_networks(self, query):
+        logger.info("Handling list-networks request")
+        # Check if WiFi Direct is enabled
+        if self.wifi_manager.wifi_direct:
+            logger.info("WiFi Direct is active, returning empty network list")
+            self._write_response(_DIRECT_NETWORKS)
+            return
+
+        if 'true' in query.get('refresh', ()) or 'true' in query.get('force', ()):
+            print("Force refreshing network list...", file=sys.stderr)
+            networks = self.wifi_manager.refresh_network_cache(force_rescan=True)
+            self._invalidate_responses()
+            self._write_response(_dumps_members(
+                ("networks", self.wifi_manager.networks_json(networks)),
+                ("cache_info", _dumps(self.wifi_manager.get_cache_info())),
+            ), compress=True)
+            return
+
+        use_cache = 'true' in query.get('use_cache', ())
+        self._write_cached(self.path, lambda: self._list_networks_response(use_cache))
+
+    def _handle_cache_info(self, query):
+        # The wrapper reuses the encoding for up to response_ttl while the cache is unchanged
+        self._write_response(_dumps_with({}, "cache_info", self.wifi_manager.cache_info_json(self.response_ttl)))
+
+    def _handle_list_connected(self, query):
+        # Check if WiFi Direct is enabled
+        if self.wifi_manager.wifi_direct:
+            self._write_response(_DIRECT_CONNECTED)
+            return
+
+        self._write_cached(self.path, lambda: {"connected": self.wifi_manager.list_connected()})
+
+    def _handle_list_saved(self, query):
+        # Check if WiFi Direct is enabled
+        if self.wifi_manager.wifi_direct:
+            self._write_response(_DIRECT_SAVED)
+            return
+
+        self._write_cached(self.path, lambda: {"saved_networks": self.wifi_manager.list_saved()}, self.saved_ttl)
+
+    def _handle_hotspot_status(self, query):
+        # hotspot_status_json reuses the encoding until the status changes
+        self._write_response(_dumps_with({}, "hotspot", self.wifi_manager.hotspot_status_json()))
+
+    def _handle_health(self, query):
+        # Simple health check endpoint
+        self._write_json({
+            "status": "healthy",
+            "timestamp": datetime.now().isoformat()
+        })
+
+    def _handle_connection_status(self, query):
+        # Get both connection and hotspot status
+        connected, hotspot_status = self.wifi_manager.status_snapshot()
+        self._write_response(_dumps_members(
+            ("connected", _dumps(connected)),
+            ("hotspot", self.wifi_manager.hotspot_status_json(hotspot_status)),
+            ("server_status", b'"online"'),
+        ))
+
+    def _handle_static(self, path):
+        rel_path = path.removeprefix('/ui/public/static/')
+        fs_path = os.path.realpath(os.path.join(_STATIC_ROOT, rel_path))
 
+        # Refuse anything that resolves outside the static directory
+        if not fs_path.startswith(_STATIC_ROOT + os.sep):
+            self._write_response(_ERR_FILE_NOT_FOUND, 404)
+            return
+
+        # One open + fstat instead of exists/isfile/stat checks that could race
+        try:
+            f = open(fs_path, 'rb')
+        except OSError:
+            self._write_response(_ERR_FILE_NOT_FOUND, 404)
+            return
+        with f:
+            st = os.fstat(f.fileno())
+            if stat.S_ISREG(st.st_mode):
+                self._send_static_file(f, st, fs_path)
+            else:
+                self._write_response(_ERR_FILE_NOT_FOUND, 404)
+
+    def do_GET(self):
+        logger.debug("GET request: %s", self.path)
+
+        # Split off the query once; most polling requests have none to parse
+        path, _, query = self.path.partition('?')
+        handler = self._GET_ROUTES.get(path)
+        if handler is not None:
+            handler(self, parse_qs(query) if query else {})
+        elif path.startswith('/ui/public/static'):
+            self._handle_static(path)
+        elif path in self._POST_ROUTES:
+            self._write_response(_ERR_METHOD_NOT_ALLOWED, 405, headers=b"Allow: POST, OPTIONS\r\n")
         else:
-            self._set_headers(404)
-            self.wfile.write(json.dumps({"error": "Not found"}).encode())
-  
+            self._write_response(_ERR_NOT_FOUND, 404)
+
+    def _handle_forget_all(self, data):
+        if self.wifi_manager.wifi_direct:
+            self._write_response(_ERR_WIFI_DIRECT_FORBIDDEN, 403)
+            return
+
+        success = self.wifi_manager.forget_all()
+        # forget_all starts the hotspot itself; only retry if that did not take
+        if success and not self.wifi_manager.hotspot_running():
+            self.wifi_manager.start_hotspot()
+        self._write_response(_OK_TRUE if success else _OK_FALSE)
+
+    def _handle_forget_network(self, data):
+        if self.wifi_manager.wifi_direct:
+            self._write_response(_ERR_WIFI_DIRECT_FORBIDDEN, 403)
+            return
+
+        if 'ssid' not in data:
+            self._write_response(_ERR_SSID_REQ, 400)
+            return
+
+        ssid = data['ssid']
+        success = self.wifi_manager.forget_network(ssid)
+        self._write_response(_OK_TRUE if success else _OK_FALSE)
+
+    def _handle_connect(self, data):
+        logger.info("Handling connect request")
+        if self.wifi_manager.wifi_direct:
+            logger.warning("Connect request blocked - WiFi Direct mode active")
+            self._write_response(_ERR_WIFI_DIRECT_FORBIDDEN, 403)
+            return
+
+        if 'ssid' not in data:
+            logger.error("Connect request missing SSID")
+            self._write_response(_ERR_SSID_REQ, 400)
+            return
+
+        ssid = data['ssid']
+        passphrase = data.get('passphrase')
+
+        logger.info("Received connection request for '%s' (passphrase provided: %s)", ssid, passphrase is not None)
+        print(f"Received connection request for '{ssid}'", file=sys.stderr)
+
+        # Check hotspot status before connection attempt
+        initial_hotspot_status = self.wifi_manager.check_hotspot_status()
+        was_hotspot_running = initial_hotspot_status.get("running", False)
+        logger.debug("Initial hotspot status: running=%s", was_hotspot_running)
+
+        if was_hotspot_running:
+            logger.info("Hotspot is running, will be stopped for connection attempt")
+            print("Hotspot is running, will be stopped for connection attempt", file=sys.stderr)
+
+        # Attempt connection (this handles hotspot stopping/restarting internally)
+        logger.info("Attempting connection...")
+        success = self.wifi_manager.connect(ssid, passphrase)
+
+        # One snapshot of both statuses, reusing what connect() just read where it
+        # is still fresh. A failed attempt is already settled (connect() waited and
+        # restored the hotspot), so only a success that does not show yet is polled
+        wifi_manager = self.wifi_manager
+        connected, hotspot_status = wifi_manager.status_snapshot()
+        if success and not (connected and connected.get('ssid') == ssid):
+            connected = wifi_manager.wait_for_connection(ssid, 2) or wifi_manager.list_connected()
+            hotspot_status = wifi_manager.check_hotspot_status()
+
+        message = None
+        if success and connected:
+            message = f"Successfully connected to '{ssid}'"
+            if was_hotspot_running:
+                message += " - Hotspot stopped"
+        elif not success:
+            message = f"Failed to connect to '{ssid}'"
+            if was_hotspot_running and hotspot_status.get("running", False):
+                message += " - Hotspot has been restarted"
+            elif was_hotspot_running and not hotspot_status.get("running", False):
+                message += " - Hotspot failed to restart"
+
+        members = [
+            ("success", _dumps(success)),
+            ("connected", _dumps(connected)),
+            ("hotspot", self.wifi_manager.hotspot_status_json(hotspot_status)),
+            ("was_hotspot_running", _dumps(was_hotspot_running)),
+        ]
+        if message is not None:
+            members.append(("message", _dumps(message)))
+        self._write_response(_dumps_members(*members))
+
+    def _handle_start_hotspot(self, data):
+        success = self.wifi_manager.start_hotspot()
+        self._write_response(_OK_TRUE if success else _OK_FALSE)
+
+    def _handle_stop_hotspot(self, data):
+        success = self.wifi_manager.stop_hotspot()
+        self._write_response(_OK_TRUE if success else _OK_FALSE)
+
+    def _handle_restart_hotspot(self, data):
+        success = self.wifi_manager.restart_hotspot()
+        self._write_response(_OK_TRUE if success else _OK_FALSE)
+
+    def _handle_refresh_networks(self, data):
+        # Force refresh the network cache
+        networks = self.wifi_manager.refresh_network_cache(force_rescan=True)
+        cache_info = self.wifi_manager.get_cache_info()
+        self._write_response(_dumps_members(
+            ("success", b"true"),
+            ("networks", self.wifi_manager.networks_json(networks)),
+            ("cache_info", _dumps(cache_info)),
+        ), compress=True)
+
+    def _handle_clear_cache(self, data):
+        # Clear the network cache
+        self.wifi_manager.clear_cache()
+        self._write_response(_OK_TRUE)
+
+    def _handle_set_wifi_direct(self, data):
+        if 'value' not in data:
+            self._write_response(_ERR_VALUE_REQ, 400)
+            return
+
+        value = str(data['value']).lower()
+        body = _WIFI_DIRECT_SET.get(value)
+        if body is None:
+            self._write_response(_ERR_INVALID_VALUE, 400)
+            return
+
+        # Set the value first
+        self.wifi_manager.set_wifi_direct(value)
+
+        # Send success response
+        self._write_response(body)
+
+        # Start restart in background after response is sent
+        def delayed_restart():
+            time.sleep(1)  # Give client time to receive response
+            threading.Thread(target=restart_machine).start()
+
+        threading.Thread(target=delayed_restart).start()
+
     def do_POST(self):
-        logger.debug(f"POST request: {self.path}")
-        content_length = int(self.headers['Content-Length'])
+        logger.debug("POST request: %s", self.path)
+        try:
+            content_length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            content_length = -1
+        if content_length < 0:
+            self.send_error(400, "Invalid Content-Length")
+            return
+        if content_length > _MAX_POST_BYTES:
+            # Refuse before reading; the unread body means the connection is closed
+            self.send_error(413, "Payload too large")
+            return
         post_data = self.rfile.read(content_length)
-        logger.debug(f"POST data length: {content_length} bytes")
-        
+        logger.debug("POST data length: %d bytes", content_length)
+
+        # Resolve the route first so unknown paths skip decoding and invalidation;
+        # like GET, a query string does not change which handler runs
+        path = self.path.partition('?')[0]
+        handler = self._POST_ROUTES.get(path)
+        if handler is None:
+            if path in self._GET_ROUTES:
+                self._write_response(_ERR_METHOD_NOT_ALLOWED, 405, headers=b"Allow: GET, OPTIONS\r\n")
+            else:
+                self._write_response(_ERR_NOT_FOUND, 404)
+            return
+
+        # Every POST endpoint changes (or re-reads) wifi state
+        self._invalidate_responses()
+
         try:
-            data = json.loads(post_data.decode('utf-8'))
-            logger.debug(f"POST data: {data}")
-            
+            data = _loads(post_data)
+        except ValueError:
+            data = None
+        # Handlers index the body by key, so anything but an object is rejected here
+        if not isinstance(data, dict):
+            self._write_response(_ERR_INVALID_JSON, 400)
+            return
+        logger.debug("POST data: %s", data)
 
-            if self.path == '/forget-all':
-                            if self.wifi_manager.wifi_direct:
-                                self._set_headers(403)
-                                self.wfile.write(json.dumps({
-                                    "success": False,
-                                    "error": "Operation forbidden in WiFi Direct mode"
-                                }).encode())
-                                return
-                                
-                            success = self.wifi_manager.forget_all()
-                            self._set_headers()
-                            if success:
-                                time.sleep(2)
-                                self.wifi_manager.start_hotspot()
-                            self.wfile.write(json.dumps({"success": success}).encode())
-                        
-            elif self.path == '/forget-network':
-                if self.wifi_manager.wifi_direct:
-                    self._set_headers(403)
-                    self.wfile.write(json.dumps({
-                        "success": False,
-                        "error": "Operation forbidden in WiFi Direct mode"
-                    }).encode())
-                    return
-                    
-                if 'ssid' not in data:
-                    self._set_headers(400)
-                    self.wfile.write(json.dumps({"error": "SSID is required"}).encode())
-                    return
-                
-                ssid = data['ssid']
-                success = self.wifi_manager.forget_network(ssid)
-                self._set_headers()
-                self.wfile.write(json.dumps({"success": success}).encode())
-                        
-            elif self.path == '/connect':
-                logger.info("Handling connect request")
-                if self.wifi_manager.wifi_direct:
-                    logger.warning("Connect request blocked - WiFi Direct mode active")
-                    self._set_headers(403)
-                    self.wfile.write(json.dumps({
-                        "success": False,
-                        "error": "Operation forbidden in WiFi Direct mode"
-                    }).encode())
-                    return
-                    
-                if 'ssid' not in data:
-                    logger.error("Connect request missing SSID")
-                    self._set_headers(400)
-                    self.wfile.write(json.dumps({"error": "SSID is required"}).encode())
-                    return
-                
-                ssid = data['ssid']
-                passphrase = data.get('passphrase')
-                
-                logger.info(f"Received connection request for '{ssid}' (passphrase provided: {passphrase is not None})")
-                print(f"Received connection request for '{ssid}'", file=sys.stderr)
-                
-                # Check hotspot status before connection attempt
-                initial_hotspot_status = self.wifi_manager.check_hotspot_status()
-                was_hotspot_running = initial_hotspot_status.get("running", False)
-                logger.debug(f"Initial hotspot status: running={was_hotspot_running}")
-                
-                if was_hotspot_running:
-                    logger.info("Hotspot is running, will be stopped for connection attempt")
-                    print("Hotspot is running, will be stopped for connection attempt", file=sys.stderr)
-                
-                # Attempt connection (this handles hotspot stopping/restarting internally)
-                logger.info("Attempting connection...")
-                success = self.wifi_manager.connect(ssid, passphrase)
-                
-                # Wait a moment for status to stabilize
-                time.sleep(2)
-                
-                # Get the current connection status after attempt
-                connected = self.wifi_manager.list_connected()
-                hotspot_status = self.wifi_manager.check_hotspot_status()
-                
-                response_data = {
-                    "success": success,
-                    "connected": connected,
-                    "hotspot": hotspot_status,
-                    "was_hotspot_running": was_hotspot_running
-                }
-                
-                if success and connected:
-                    response_data["message"] = f"Successfully connected to '{ssid}'"
-                    if was_hotspot_running:
-                        response_data["message"] += " - Hotspot stopped"
-                elif not success:
-                    response_data["message"] = f"Failed to connect to '{ssid}'"
-                    if was_hotspot_running and hotspot_status.get("running", False):
-                        response_data["message"] += " - Hotspot has been restarted"
-                    elif was_hotspot_running and not hotspot_status.get("running", False):
-                        response_data["message"] += " - Hotspot failed to restart"
-                
-                self._set_headers()
-                self.wfile.write(json.dumps(response_data).encode())          
-            elif self.path == '/start-hotspot':
-                success = self.wifi_manager.start_hotspot()
-                self._set_headers()
-                self.wfile.write(json.dumps({"success": success}).encode())
-            
-            elif self.path == '/stop-hotspot':
-                success = self.wifi_manager.stop_hotspot()
-                self._set_headers()
-                self.wfile.write(json.dumps({"success": success}).encode())
-            
-            elif self.path == '/restart-hotspot':
-                success = self.wifi_manager.restart_hotspot()
-                self._set_headers()
-                self.wfile.write(json.dumps({"success": success}).encode())
-            
-            elif self.path == '/refresh-networks':
-                # Force refresh the network cache
-                networks = self.wifi_manager.list_networks(force_refresh=True)
-                cache_info = self.wifi_manager.get_cache_info()
-                self._set_headers()
-                self.wfile.write(json.dumps({
-                    "success": True,
-                    "networks": networks,
-                    "cache_info": cache_info
-                }).encode())
-            
-            elif self.path == '/clear-cache':
-                # Clear the network cache
-                self.wifi_manager.clear_cache()
-                self._set_headers()
-                self.wfile.write(json.dumps({"success": True}).encode())
-
-            elif self.path == '/set-wifi-direct':
-                if 'value' not in data:
-                    self._set_headers(400)
-                    self.wfile.write(json.dumps({"error": "Value is required"}).encode())
-                    return
-                
-                value = str(data['value']).lower()
-                if value not in ['true', 'false']:
-                    self._set_headers(400)
-                    self.wfile.write(json.dumps({"error": "Invalid value. Must be 'true' or 'false'"}).encode())
-                    return
-                
-                # Set the value first
-                self.wifi_manager.set_wifi_direct(value)
-                
-                # Send success response
-                self._set_headers()
-                self.wfile.write(json.dumps({
-                    "success": True, 
-                    "value": value,
-                    "message": "Server will restart to apply changes"
-                }).encode())
-                
-                # Start restart in background after response is sent
-                def delayed_restart():
-                    time.sleep(1)  # Give client time to receive response
-                    threading.Thread(target=restart_machine).start()
-                
-                threading.Thread(target=delayed_restart).start()
+        handler(self, data)
+
+    # Route tables, looked up once per request by path; GET handlers get the parsed query.
+    # A path found only in the other table answers 405 rather than 404
+    _GET_ROUTES = {
+        '/': _handle_index,
+        '/get-wifi-direct': _handle_get_wifi_direct,
+        '/list-networks': _handle_list_networks,
+        '/cache-info': _handle_cache_info,
+        '/list-connected': _handle_list_connected,
+        '/list-saved': _handle_list_saved,
+        '/hotspot-status': _handle_hotspot_status,
+        '/health': _handle_health,
+        '/connection-status': _handle_connection_status,
+    }
+    _POST_ROUTES = {
+        '/forget-all': _handle_forget_all,
+        '/forget-network': _handle_forget_network,
+        '/connect': _handle_connect,
+        '/start-hotspot': _handle_start_hotspot,
+        '/stop-hotspot': _handle_stop_hotspot,
+        '/restart-hotspot': _handle_restart_hotspot,
+        '/refresh-networks': _handle_refresh_networks,
+        '/clear-cache': _handle_clear_cache,
+        '/set-wifi-direct': _handle_set_wifi_direct,
+    }
 
-            else:
-                self._set_headers(404)
-                self.wfile.write(json.dumps({"error": "Not found"}).encode())
-        
-        except json.JSONDecodeError:
-            self._set_headers(400)
-            self.wfile.write(json.dumps({"error": "Invalid JSON"}).encode())
-    
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
+        # CORS preflight: the whole response is fixed, so it is written as one precomputed blob
+        self.log_request(200)
+        self.wfile.write(_OPTIONS_CLOSE if self.close_connection else _OPTIONS_RESPONSE)
 
 
 def restart_machine():
@@ -1057,48 +1731,253 @@ def restart_machine():
         # Use a more reliable restart method
         subprocess.run(['systemctl', 'restart', 'wifi-connect'], check=True)
     except Exception as e:
-        logger.error(f"Error restarting machine: {e}")
+        logger.error("Error restarting machine: %s", e)
         # Fallback to exit if systemctl fails
         try:
             subprocess.run(['exit'], check=True)
         except Exception as e2:
-            logger.error(f"Fallback restart also failed: {e2}")
+            logger.error("Fallback restart also failed: %s", e2)
 
 def get_wifi_direct_value(file_path="/data/WIFI_DIRECT"):
     """Read the current value of WIFI_DIRECT from the file"""
-    logger.debug(f"Reading WIFI_DIRECT value from {file_path}")
+    logger.debug("Reading WIFI_DIRECT value from %s", file_path)
     if os.path.exists(file_path):
         with open(file_path, 'r') as f:
             value = f.read().strip()
-            logger.debug(f"WIFI_DIRECT value from file: {value}")
+            logger.debug("WIFI_DIRECT value from file: %s", value)
             return value
     else:
-        logger.debug(f"WIFI_DIRECT file not found at {file_path}, returning 'false'")
+        logger.debug("WIFI_DIRECT file not found at %s, returning 'false'", file_path)
         return "false"
 
 def set_wifi_direct_value(value, file_path="/data/WIFI_DIRECT"):
     """Write a new value to the WIFI_DIRECT file"""
-    logger.debug(f"Setting WIFI_DIRECT to '{value}' in {file_path}")
+    logger.debug("Setting WIFI_DIRECT to '%s' in %s", value, file_path)
     with open(file_path, 'w') as f:
         f.write(str(value).lower())
-    logger.info(f"WIFI_DIRECT set to: {value}")
+    logger.info("WIFI_DIRECT set to: %s", value)
     print(f"WIFI_DIRECT set to: {value}")
 
-def run_server(server_class=HTTPServer, port=8000, wifi_manager=None):
+class PooledHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that hands connections to a fixed pool of worker threads
+    instead of starting a new thread for every connection.
+
+    A worker only holds a connection while it has requests to serve. Idle
+    keep-alive connections are parked in a selector (epoll on Linux) and
+    queued for a worker again once the client sends its next request.
+    """
+    max_workers = 32  # connections with a request in progress
+    idle_timeout = 30  # seconds a parked keep-alive connection is kept open
+    parks_idle_connections = True  # see WiFiHandler.handle
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._requests = queue.SimpleQueue()
+        self._selector = selectors.DefaultSelector()
+        self._selector_lock = threading.Lock()
+        self._closing = False
+        # Daemon threads, as with daemon_threads: a worker busy with a slow
+        # request must not hold up interpreter exit
+        for i in range(self.max_workers):
+            threading.Thread(target=self._worker, name=f'http_{i}', daemon=True).start()
+        threading.Thread(target=self._watch_idle, name='http_idle', daemon=True).start()
+
+    def _worker(self):
+        while (item := self._requests.get()) is not None:
+            self._serve(*item)
+
+    def _serve(self, request, client_address):
+        """Serve a connection's ready requests, then park it or shut it down"""
+        try:
+            handler = self.RequestHandlerClass(request, client_address, self)
+        except Exception:
+            self.handle_error(request, client_address)
+        else:
+            if not handler.close_connection and not self._closing:
+                with self._selector_lock:
+                    self._selector.register(request, selectors.EVENT_READ,
+                                            (client_address, time.monotonic()))
+                return
+        self.shutdown_request(request)
+
+    def _watch_idle(self):
+        """Queue parked connections that become readable; close those idle too long"""
+        last_sweep = time.monotonic()
+        while not self._closing:
+            # The timeout also bounds how late a connection parked mid-select is
+            # noticed on platforms whose selector does not see it at once
+            events = self._selector.select(timeout=1)
+            with self._selector_lock:
+                for key, _ in events:
+                    self._selector.unregister(key.fileobj)
+                    self._requests.put((key.fileobj, key.data[0]))
+                now = time.monotonic()
+                if now - last_sweep >= 1:
+                    last_sweep = now
+                    for key in list(self._selector.get_map().values()):
+                        if now - key.data[1] > self.idle_timeout:
+                            self._selector.unregister(key.fileobj)
+                            self.shutdown_request(key.fileobj)
+
+    def process_request(self, request, client_address):
+        self._requests.put((request, client_address))
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        with self._selector_lock:
+            for key in list(self._selector.get_map().values()):
+                self._selector.unregister(key.fileobj)
+                self.shutdown_request(key.fileobj)
+        for _ in range(self.max_workers):
+            self._requests.put(None)
+
+def run_server(server_class=PooledHTTPServer, port=8000, wifi_manager=None, response_ttl=2):
     """Start the HTTP server"""
-    logger.info(f"Starting HTTP server on port {port}")
+    logger.info("Starting HTTP server on port %s", port)
     server_address = ('', port)
     
     # Set the wifi_manager in the handler class
     WiFiHandler.wifi_manager = wifi_manager
+    WiFiHandler.response_ttl = response_ttl
     
     httpd = server_class(server_address, WiFiHandler)
     print(f"Starting server on port {port}...")
     logger.info("Server started successfully")
     httpd.serve_forever()
 
-def main():
-    logger.info("Starting WiFi Connect API")
+def _cli_cache_info(wifi_manager, args):
+    """Handle --cache-info"""
+    cache_info = wifi_manager.get_cache_info()
+    print("Network Cache Information:")
+    print(f"Cached: {cache_info['cached']}")
+    if cache_info['cached']:
+        print(f"Cache Age: {cache_info['cache_age']:.1f} seconds")
+        print(f"Cache Valid: {cache_info['cache_valid']}")
+        print(f"Networks Count: {cache_info['networks_count']}")
+        print(f"Cache Timestamp: {cache_info['cache_timestamp']}")
+
+def _cli_clear_cache(wifi_manager, args):
+    """Handle --clear-cache"""
+    wifi_manager.clear_cache()
+    print("Network cache cleared.")
+
+def _cli_list_networks(wifi_manager, args):
+    """Handle --list-networks"""
+    networks = wifi_manager.list_networks()
+    cache_info = wifi_manager.get_cache_info()
+    print("Available WiFi networks:")
+    if networks:
+        for idx, network in enumerate(networks, 1):
+            print(f"{idx}. {network['ssid']} (Security: {network['security']})")
+    else:
+        print("No networks found.")
+    
+    if cache_info['cached']:
+        print(f"\n(Using cached data, age: {cache_info['cache_age']:.1f}s)")
+
+def _cli_list_connected(wifi_manager, args):
+    """Handle --list-connected"""
+    connected = wifi_manager.list_connected()
+    if connected:
+        print("Currently connected network:")
+        print(f"SSID: {connected['ssid']}")
+        print(f"Security: {connected['security']}")
+        print(f"Signal Strength: {connected['signal_strength']}%")
+        print(f"Interface: {connected['interface']}")
+        if connected['ip_address']:
+            print(f"IP Address: {connected['ip_address']}")
+    else:
+        print("No network currently connected.")
+
+def _cli_list_saved(wifi_manager, args):
+    """Handle --list-saved"""
+    saved_networks = wifi_manager.list_saved()
+    print("Saved WiFi networks:")
+    if saved_networks:
+        for idx, network in enumerate(saved_networks, 1):
+            print(f"{idx}. {network['ssid']} (Security: {network['security']})")
+    else:
+        print("No saved networks found.")
+
+def _cli_forget_network(wifi_manager, args):
+    """Handle --forget-network"""
+    if wifi_manager.forget_network(args.forget_network):
+        print(f"Successfully forgot network '{args.forget_network}'.")
+    else:
+        print(f"Failed to forget network '{args.forget_network}'.")
+
+def _cli_forget_all(wifi_manager, args):
+    """Handle --forget-all"""
+    if wifi_manager.forget_all():
+        print("All saved WiFi networks have been forgotten.")
+    else:
+        print("Failed to forget WiFi networks.")
+
+def _cli_connect(wifi_manager, args):
+    """Handle --connect"""
+    if wifi_manager.connect(args.connect, args.passphrase):
+        print(f"Connected to {args.connect}.")
+    else:
+        print(f"Failed to connect to {args.connect}.")
+
+def _cli_start_hotspot(wifi_manager, args):
+    """Handle --start-hotspot"""
+    if wifi_manager.start_hotspot():
+        print("Hotspot started successfully.")
+    else:
+        print("Failed to start hotspot.")
+
+def _cli_stop_hotspot(wifi_manager, args):
+    """Handle --stop-hotspot"""
+    if wifi_manager.stop_hotspot():
+        print("Hotspot stopped successfully.")
+    else:
+        print("Failed to stop hotspot.")
+
+def _cli_restart_hotspot(wifi_manager, args):
+    """Handle --restart-hotspot"""
+    if wifi_manager.restart_hotspot():
+        print("Hotspot restarted successfully.")
+    else:
+        print("Failed to restart hotspot.")
+
+def _cli_check_hotspot(wifi_manager, args):
+    """Handle --check-hotspot"""
+    status = wifi_manager.check_hotspot_status()
+    if status.get("running", False):
+        print("Hotspot Status: RUNNING")
+        if status.get("ssid"):
+            print(f"SSID: {status['ssid']}")
+        if status.get("gateway"):
+            print(f"Gateway: {status['gateway']}")
+        if status.get("interface"):
+            print(f"Interface: {status['interface']}")
+        print(f"Password Protected: {status.get('password_protected', False)}")
+        if status.get("uptime"):
+            print(f"Uptime: {status['uptime']}")
+    else:
+        print("Hotspot Status: STOPPED")
+
+# One-shot command-line operations, checked in order; the first flag set runs and exits
+_CLI_ACTIONS = (
+    ('cache_info', _cli_cache_info),
+    ('clear_cache', _cli_clear_cache),
+    ('list_networks', _cli_list_networks),
+    ('list_connected', _cli_list_connected),
+    ('list_saved', _cli_list_saved),
+    ('forget_network', _cli_forget_network),
+    ('forget_all', _cli_forget_all),
+    ('connect', _cli_connect),
+    ('start_hotspot', _cli_start_hotspot),
+    ('stop_hotspot', _cli_stop_hotspot),
+    ('restart_hotspot', _cli_restart_hotspot),
+    ('check_hotspot', _cli_check_hotspot),
+)
+
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Build the command-line parser once; later calls return the same instance"""
     parser = argparse.ArgumentParser(description='WiFi Connection Manager with Network Caching')
     parser.add_argument('--binary', default='wifi-connect', help='Path to the wifi-connect binary (default: wifi-connect)')
     parser.add_argument('--cache-duration', type=int, default=300, help='Network cache duration in seconds (default: 300)')
@@ -1117,138 +1996,32 @@ def main():
     parser.add_argument('--port', type=int, default=8000, help='Port for the server to listen on (default: 8000)')
     parser.add_argument('--clear-cache', action='store_true', help='Clear the network cache and exit')
     parser.add_argument('--cache-info', action='store_true', help='Show cache information and exit')
+    parser.add_argument('--status-ttl', type=float, default=0.5, help='Seconds to reuse a hotspot/connection status read (default: 0.5)')
+    parser.add_argument('--response-ttl', type=float, default=2, help='Seconds to reuse encoded list-networks/list-connected responses (default: 2)')
+    return parser
+
+def main():
+    logger.info("Starting WiFi Connect API")
+    args = _build_parser().parse_args()
+    logger.debug("Command line arguments: %s", args)
     
-    args = parser.parse_args()
-    logger.debug(f"Command line arguments: {args}")
-    
-    wifi_manager = WiFiConnectWrapper(binary_path=args.binary, cache_duration=args.cache_duration)
+    wifi_manager = WiFiConnectWrapper(binary_path=args.binary, cache_duration=args.cache_duration,
+                                      status_ttl=args.status_ttl)
     
     # Command-line operations
-    if args.cache_info:
-        cache_info = wifi_manager.get_cache_info()
-        print("Network Cache Information:")
-        print(f"Cached: {cache_info['cached']}")
-        if cache_info['cached']:
-            print(f"Cache Age: {cache_info['cache_age']:.1f} seconds")
-            print(f"Cache Valid: {cache_info['cache_valid']}")
-            print(f"Networks Count: {cache_info['networks_count']}")
-            print(f"Cache Timestamp: {cache_info['cache_timestamp']}")
-        sys.exit(0)
-    
-    if args.clear_cache:
-        wifi_manager.clear_cache()
-        print("Network cache cleared.")
-        sys.exit(0)
-    
-    if args.list_networks:
-        networks = wifi_manager.list_networks()
-        cache_info = wifi_manager.get_cache_info()
-        print("Available WiFi networks:")
-        if networks:
-            for idx, network in enumerate(networks, 1):
-                print(f"{idx}. {network['ssid']} (Security: {network['security']})")
-        else:
-            print("No networks found.")
-        
-        if cache_info['cached']:
-            print(f"\n(Using cached data, age: {cache_info['cache_age']:.1f}s)")
-        sys.exit(0)
-    
-    if args.list_connected:
-        connected = wifi_manager.list_connected()
-        if connected:
-            print("Currently connected network:")
-            print(f"SSID: {connected['ssid']}")
-            print(f"Security: {connected['security']}")
-            print(f"Signal Strength: {connected['signal_strength']}%")
-            print(f"Interface: {connected['interface']}")
-            if connected['ip_address']:
-                print(f"IP Address: {connected['ip_address']}")
-        else:
-            print("No network currently connected.")
-        sys.exit(0)
-    
-    if args.list_saved:
-        saved_networks = wifi_manager.list_saved()
-        print("Saved WiFi networks:")
-        if saved_networks:
-            for idx, network in enumerate(saved_networks, 1):
-                print(f"{idx}. {network['ssid']} (Security: {network['security']})")
-        else:
-            print("No saved networks found.")
-        sys.exit(0)
-    
-    if args.forget_network:
-        if wifi_manager.forget_network(args.forget_network):
-            print(f"Successfully forgot network '{args.forget_network}'.")
-        else:
-            print(f"Failed to forget network '{args.forget_network}'.")
-        sys.exit(0)
-    
-    if args.forget_all:
-        if wifi_manager.forget_all():
-            print("All saved WiFi networks have been forgotten.")
-        else:
-            print("Failed to forget WiFi networks.")
-        sys.exit(0)
-    
-    if args.connect:
-        if wifi_manager.connect(args.connect, args.passphrase):
-            print(f"Connected to {args.connect}.")
-        else:
-            print(f"Failed to connect to {args.connect}.")
-        sys.exit(0)
-    
-    if args.start_hotspot:
-        if wifi_manager.start_hotspot():
-            print("Hotspot started successfully.")
-        else:
-            print("Failed to start hotspot.")
-        sys.exit(0)
-    
-    if args.stop_hotspot:
-        if wifi_manager.stop_hotspot():
-            print("Hotspot stopped successfully.")
-        else:
-            print("Failed to stop hotspot.")
-        sys.exit(0)
-    
-    if args.restart_hotspot:
-        if wifi_manager.restart_hotspot():
-            print("Hotspot restarted successfully.")
-        else:
-            print("Failed to restart hotspot.")
-        sys.exit(0)
-    
-    if args.check_hotspot:
-        status = wifi_manager.check_hotspot_status()
-        if status.get("running", False):
-            print("Hotspot Status: RUNNING")
-            if status.get("ssid"):
-                print(f"SSID: {status['ssid']}")
-            if status.get("gateway"):
-                print(f"Gateway: {status['gateway']}")
-            if status.get("interface"):
-                print(f"Interface: {status['interface']}")
-            print(f"Password Protected: {status.get('password_protected', False)}")
-            if status.get("uptime"):
-                print(f"Uptime: {status['uptime']}")
-        else:
-            print("Hotspot Status: STOPPED")
-        sys.exit(0)
+    for name, action in _CLI_ACTIONS:
+        if getattr(args, name):
+            action(wifi_manager, args)
+            sys.exit(0)
     
     # Run as a server if no other operations are specified or --serve is used
-    if args.serve or (not any([args.list_networks, args.list_connected, args.list_saved, 
-                              args.forget_all, args.forget_network, args.connect,
-                              args.start_hotspot, args.stop_hotspot, args.restart_hotspot,
-                              args.check_hotspot, args.clear_cache, args.cache_info])):
-        logger.info("Starting server mode")
-        try:
-            run_server(port=args.port, wifi_manager=wifi_manager)
-        except KeyboardInterrupt:
-            logger.info("Received keyboard interrupt, shutting down server...")
-            print("\nShutting down server...")
-            sys.exit(0)
+    logger.info("Starting server mode")
+    try:
+        run_server(port=args.port, wifi_manager=wifi_manager, response_ttl=args.response_ttl)
+    except KeyboardInterrupt:
+        logger.info("Received keyboard interrupt, shutting down server...")
+        print("\nShutting down server...")
+        sys.exit(0)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTTP layer in scripts/api.py: WiFiHandler served by
+PooledHTTPServer on a local port, against a stub WiFiConnectWrapper.
+Run with: python -m unittest discover tests
+"""
+
+import gzip
+import http.client
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import api
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class CodecTest(unittest.TestCase):
+    """The pre-encoded splices must produce the same JSON as encoding the whole object"""
+
+    def test_dumps_is_compact_utf8(self):
+        self.assertEqual(api._dumps({"ssid": "Büro", "n": [1, None]}),
+                         '{"ssid":"Büro","n":[1,null]}'.encode())
+
+    def test_dumps_with_appends_member(self):
+        encoded = api._dumps({"running": False})
+        self.assertEqual(json.loads(api._dumps_with({"a": 1}, "hotspot", encoded)),
+                         {"a": 1, "hotspot": {"running": False}})
+        self.assertEqual(api._dumps_with({}, "hotspot", encoded), b'{"hotspot":{"running":false}}')
+
+    def test_dumps_members_keeps_order(self):
+        body = api._dumps_members(("success", b"true"), ("networks", api._dumps([])),
+                                  ("cache_info", api._dumps({"cached": False})))
+        self.assertEqual(body, b'{"success":true,"networks":[],"cache_info":{"cached":false}}')
+
+
+class AcceptEncodingTest(unittest.TestCase):
+    def test_gzip_negotiation(self):
+        cases = {
+            "gzip": True,
+            "deflate, GZIP;q=0.5": True,
+            "x-gzip": True,
+            "br, *;q=0.1": True,
+            "gzip;q=0": False,
+            "gzip; q=0.000": False,
+            "gzip;q=0, *": False,
+            "*;q=0": False,
+            "identity": False,
+            "": False,
+        }
+        for header, expected in cases.items():
+            with self.subTest(accept_encoding=header):
+                self.assertIs(api._accepts_gzip(header), expected)
+
+
+class StubWrapper:
+    """Just enough of WiFiConnectWrapper for the handlers, without a binary"""
+    wifi_direct = False
+
+    def __init__(self):
+        self.networks = [{"ssid": "Home", "security": "wpa"}]
+        self.saved = [{"ssid": "Home", "security": "wpa"}]
+        self.cleared = 0
+        self.connected = {"ssid": "Home", "security": "wpa"}
+        self.connect_succeeds = True
+
+    def refresh_network_cache(self, force_rescan=False, allow_stale=False):
+        return self.networks
+
+    def networks_json(self, networks):
+        return api._dumps(networks)
+
+    def get_cache_info(self):
+        return {"cached": True, "networks_count": len(self.networks)}
+
+    def list_saved(self):
+        return self.saved
+
+    def hotspot_status_json(self, status=None):
+        return api._dumps({"running": False})
+
+    def clear_cache(self):
+        self.cleared += 1
+
+    def check_hotspot_status(self, force=False):
+        return {"running": False}
+
+    def list_connected(self, force=False):
+        return self.connected
+
+    def status_snapshot(self):
+        return self.list_connected(), self.check_hotspot_status()
+
+    def connect(self, ssid, passphrase=None):
+        return self.connect_succeeds
+
+    def wait_for_connection(self, ssid, timeout):
+        return self.connected
+
+
+class ServerTestCase(unittest.TestCase):
+    """Serves WiFiHandler on a local port for the length of each test"""
+
+    def setUp(self):
+        self.wrapper = StubWrapper()
+        patcher = mock.patch.object(api.WiFiHandler, "wifi_manager", self.wrapper)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        api.WiFiHandler._invalidate_responses()
+
+        self.server = api.PooledHTTPServer(("127.0.0.1", 0), api.WiFiHandler)
+        thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def _request(self, method, path, body=None, headers=None):
+        """Send one request on a fresh connection; returns (response, body bytes)"""
+        conn = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        self.addCleanup(conn.close)
+        conn.request(method, path, body=body, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+
+    def _raw_post(self, path, content_length):
+        """POST with a hand-written Content-Length header and no body"""
+        conn = http.client.HTTPConnection(*self.server.server_address, timeout=5)
+        self.addCleanup(conn.close)
+        conn.putrequest("POST", path)
+        conn.putheader("Content-Length", content_length)
+        conn.endheaders()
+        response = conn.getresponse()
+        return response, response.read()
+
+
+class HandlerTest(ServerTestCase):
+    def test_unknown_path_is_404(self):
+        response, body = self._request("GET", "/nope")
+        self.assertEqual(response.status, 404)
+        self.assertEqual(json.loads(body), {"error": "Not found"})
+
+    def test_get_on_post_route_is_405(self):
+        response, body = self._request("GET", "/clear-cache")
+        self.assertEqual(response.status, 405)
+        self.assertEqual(response.getheader("Allow"), "POST, OPTIONS")
+        self.assertEqual(json.loads(body), {"error": "Method not allowed"})
+        self.assertEqual(self.wrapper.cleared, 0)
+
+    def test_post_on_get_route_is_405(self):
+        response, _ = self._request("POST", "/list-saved", body=b"{}")
+        self.assertEqual(response.status, 405)
+        self.assertEqual(response.getheader("Allow"), "GET, OPTIONS")
+
+    def test_post_route_ignores_query_string(self):
+        response, body = self._request("POST", "/clear-cache?x=1", body=b"{}")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(body), {"success": True})
+        self.assertEqual(self.wrapper.cleared, 1)
+
+    def test_oversized_body_is_413(self):
+        response, _ = self._raw_post("/clear-cache", str(api._MAX_POST_BYTES + 1))
+        self.assertEqual(response.status, 413)
+        self.assertEqual(response.getheader("Connection"), "close")
+        self.assertEqual(self.wrapper.cleared, 0)
+
+    def test_invalid_content_length_is_400(self):
+        for value in ("abc", "-3"):
+            with self.subTest(content_length=value):
+                response, body = self._raw_post("/clear-cache", value)
+                self.assertEqual(response.status, 400)
+                self.assertEqual(json.loads(body), {"error": "Invalid Content-Length"})
+        self.assertEqual(self.wrapper.cleared, 0)
+
+    def test_body_must_be_a_json_object(self):
+        for body in (b"[1]", b"not json", b""):
+            with self.subTest(body=body):
+                response, data = self._request("POST", "/clear-cache", body=body)
+                self.assertEqual(response.status, 400)
+                self.assertEqual(json.loads(data), {"error": "Invalid JSON"})
+        self.assertEqual(self.wrapper.cleared, 0)
+
+    def test_large_list_is_gzipped_when_accepted(self):
+        self.wrapper.saved = [{"ssid": f"Network {i}", "security": "wpa2"} for i in range(40)]
+        expected = {"saved_networks": self.wrapper.saved}
+
+        response, body = self._request("GET", "/list-saved", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(json.loads(gzip.decompress(body)), expected)
+
+        response, body = self._request("GET", "/list-saved")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(json.loads(body), expected)
+
+    def test_cached_list_is_compressed_once(self):
+        self.wrapper.saved = [{"ssid": f"Network {i}", "security": "wpa2"} for i in range(40)]
+        with mock.patch.object(api.gzip, "compress", wraps=gzip.compress) as compress:
+            for _ in range(3):
+                response, body = self._request("GET", "/list-saved", headers={"Accept-Encoding": "gzip"})
+                self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+                self.assertEqual(json.loads(gzip.decompress(body)), {"saved_networks": self.wrapper.saved})
+        self.assertEqual(compress.call_count, 1)
+
+    def test_gzip_refused_with_q_zero(self):
+        self.wrapper.saved = [{"ssid": f"Network {i}", "security": "wpa2"} for i in range(40)]
+        for accept in ("gzip;q=0", "gzip;q=0, *", "*;q=0", "identity"):
+            with self.subTest(accept_encoding=accept):
+                response, body = self._request("GET", "/list-saved", headers={"Accept-Encoding": accept})
+                self.assertIsNone(response.getheader("Content-Encoding"))
+                self.assertEqual(json.loads(body), {"saved_networks": self.wrapper.saved})
+
+    def test_small_list_is_not_gzipped(self):
+        response, body = self._request("GET", "/list-saved", headers={"Accept-Encoding": "gzip"})
+        self.assertLessEqual(len(body), api._GZIP_MIN_BYTES)
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(json.loads(body), {"saved_networks": self.wrapper.saved})
+
+    def test_refresh_networks_response_shape(self):
+        response, body = self._request("POST", "/refresh-networks", body=b"{}")
+        self.assertEqual(response.status, 200)
+        data = json.loads(body)
+        self.assertEqual(list(data), ["success", "networks", "cache_info"])
+        self.assertEqual(data["networks"], self.wrapper.networks)
+        self.assertEqual(data["cache_info"], self.wrapper.get_cache_info())
+
+        response, body = self._request("GET", "/list-networks?refresh=true")
+        data = json.loads(body)
+        self.assertEqual(list(data), ["networks", "cache_info"])
+        self.assertEqual(data["networks"], self.wrapper.networks)
+
+
+    def test_connection_status_response_shape(self):
+        response, body = self._request("GET", "/connection-status")
+        data = json.loads(body)
+        self.assertEqual(list(data), ["connected", "hotspot", "server_status"])
+        self.assertEqual(data["connected"], self.wrapper.connected)
+        self.assertEqual(data["hotspot"], {"running": False})
+        self.assertEqual(data["server_status"], "online")
+
+    def test_connect_response_shape(self):
+        response, body = self._request("POST", "/connect", body=b'{"ssid": "Home"}')
+        data = json.loads(body)
+        self.assertEqual(list(data), ["success", "connected", "hotspot", "was_hotspot_running", "message"])
+        self.assertEqual(data["message"], "Successfully connected to 'Home'")
+
+        self.wrapper.connect_succeeds = False
+        response, body = self._request("POST", "/connect", body=b'{"ssid": "Cafe"}')
+        data = json.loads(body)
+        self.assertEqual(list(data), ["success", "connected", "hotspot", "was_hotspot_running", "message"])
+        self.assertFalse(data["success"])
+        self.assertEqual(data["message"], "Failed to connect to 'Cafe'")
+
+
+class FileHandlerTest(ServerTestCase):
+    """index.html and static assets, served from a temporary directory"""
+
+    def setUp(self):
+        super().setUp()
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        static_root = os.path.join(tmpdir.name, "ui", "public", "static")
+        os.makedirs(static_root)
+        with open(os.path.join(tmpdir.name, "index.html"), "w") as f:
+            f.write("<html>index</html>")
+        with open(os.path.join(static_root, "app.js"), "w") as f:
+            f.write("console.log(1);")
+        with open(os.path.join(tmpdir.name, "secret.txt"), "w") as f:
+            f.write("secret")
+
+        cwd = os.getcwd()
+        os.chdir(tmpdir.name)
+        self.addCleanup(os.chdir, cwd)
+        patcher = mock.patch.object(api, "_STATIC_ROOT", os.path.realpath(static_root))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        api._render_index.cache_clear()
+
+    def test_index_etag_and_304(self):
+        response, body = self._request("GET", "/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<html>index</html>")
+        etag = response.getheader("ETag")
+        self.assertTrue(etag)
+
+        response, body = self._request("GET", "/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_static_file_and_304(self):
+        response, body = self._request("GET", "/ui/public/static/app.js")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"console.log(1);")
+        etag = response.getheader("ETag")
+
+        response, _ = self._request("GET", "/ui/public/static/app.js", headers={"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+
+    def test_static_traversal_is_404(self):
+        for path in ("/ui/public/static/../../../secret.txt", "/ui/public/static/missing.js",
+                     "/ui/public/static/"):
+            with self.subTest(path=path):
+                response, body = self._request("GET", path)
+                self.assertEqual(response.status, 404)
+                self.assertEqual(json.loads(body), {"error": "File not found"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the configuration system in config.py
+Run with: python -m unittest discover tests
+"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from config import Config
+
+
+class ConfigTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.config_file = os.path.join(self.tmpdir.name, "wifi_config.json")
+        # Only the variables a test sets may influence the result
+        env = mock.patch.dict(os.environ, {}, clear=True)
+        env.start()
+        self.addCleanup(env.stop)
+
+    def test_defaults_without_file(self):
+        config = Config(self.config_file)
+        self.assertEqual(config.get("server.port"), 8080)
+        self.assertEqual(config.get("wifi.startup_cleanup.enabled"), True)
+        self.assertIsNone(config.get("wifi.missing"))
+        self.assertEqual(config.get("wifi.missing", 3), 3)
+
+    def test_file_values_merge_into_defaults(self):
+        with open(self.config_file, "w") as f:
+            json.dump({"server": {"port": 9000}, "wifi": {"startup_cleanup": {"enabled": False}}}, f)
+        config = Config(self.config_file)
+        self.assertEqual(config.get("server.port"), 9000)
+        self.assertEqual(config.get("server.host"), "0.0.0.0")
+        self.assertEqual(config.get("wifi.startup_cleanup.enabled"), False)
+        self.assertEqual(config.get("wifi.startup_cleanup.connections_to_delete"),
+                         ["resin-wifi", "balena-wifi-01"])
+
+    def test_env_values_are_converted(self):
+        os.environ.update({
+            "WIFI_SERVER_PORT": "9100",
+            "WIFI_CORS_ENABLED": "no",
+            "WIFI_CORS_ORIGINS": "http://a, http://b",
+        })
+        config = Config(self.config_file)
+        self.assertEqual(config.get("server.port"), 9100)
+        self.assertEqual(config.get("cors.enabled"), False)
+        self.assertEqual(config.get("cors.origins"), ["http://a", "http://b"])
+
+    def test_invalid_env_value_names_its_type(self):
+        os.environ["WIFI_SCAN_TIMEOUT"] = "soon"
+        out = io.StringIO()
+        with redirect_stdout(out):
+            config = Config(self.config_file)
+            self.assertEqual(config.get("wifi.scan_timeout"), 30)
+        self.assertIn("Invalid integer value for WIFI_SCAN_TIMEOUT: soon", out.getvalue())
+
+    def test_set_config_value_updates_get(self):
+        config = Config(self.config_file)
+        self.assertEqual(config.get("wifi.gateway"), "192.168.42.1")
+        config.set_config_value("wifi.gateway", "10.0.0.1")
+        self.assertEqual(config.get("wifi.gateway"), "10.0.0.1")
+        self.assertEqual(config.get("wifi")["gateway"], "10.0.0.1")
+
+    def test_section_copies_do_not_change_the_config(self):
+        config = Config(self.config_file)
+        config.get("wifi.scan_timeout")  # build the snapshot first
+        section = config.get_connect_config()
+        section["scan_timeout"] = 1
+        section["startup_cleanup"]["connections_to_delete"].append("other")
+        self.assertEqual(config.get("wifi.scan_timeout"), 30)
+        self.assertEqual(config.get_connect_config()["scan_timeout"], 30)
+        self.assertEqual(config.get("wifi.startup_cleanup.connections_to_delete"),
+                         ["resin-wifi", "balena-wifi-01"])
+
+    def test_save_config_round_trips(self):
+        config = Config(self.config_file)
+        config.set_config_value("server.port", 8123)
+        self.assertTrue(config.save_config())
+        self.assertEqual(Config(self.config_file).get("server.port"), 8123)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Tests for the network cache in scripts/api.py: stale-while-revalidate serving,
+background refreshes and the single shared refresh, against a fake binary.
+Run with: python -m unittest discover tests
+"""
+
+import io
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import api
+
+OLD_NETWORKS = [{"ssid": "Old", "security": "wpa"}]
+NEW_NETWORKS = [{"ssid": "Home", "security": "wpa"}, {"ssid": "Cafe", "security": "none"}]
+
+# Logs each call; the scan blocks while <dir>/hold exists and fails if <dir>/fail does
+FAKE_BINARY = """#!/bin/sh
+echo "$1" >> {dir}/calls
+case "$1" in
+  --check-hotspot) echo "Hotspot Status: STOPPED" ;;
+  --list-networks)
+    while [ -f {dir}/hold ]; do sleep 0.02; done
+    if [ -f {dir}/fail ]; then echo "scan error" >&2; exit 1; fi
+    printf 'Available WiFi Networks:\\nSSID: Home, Security: wpa\\nSSID: Cafe, Security: none\\n' ;;
+esac
+"""
+
+
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+class NetworkCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.dir = self.tmpdir.name
+        binary = os.path.join(self.dir, "wifi-connect")
+        with open(binary, "w") as f:
+            f.write(FAKE_BINARY.format(dir=self.dir))
+        os.chmod(binary, 0o755)
+        # The wrapper reports progress on stderr
+        stderr = mock.patch("sys.stderr", io.StringIO())
+        stderr.start()
+        self.addCleanup(stderr.stop)
+        self.wrapper = api.WiFiConnectWrapper(binary, cache_duration=300)
+        self.wrapper.wifi_direct = False
+        self.addCleanup(self.wrapper._status_pool.shutdown)
+        self.addCleanup(self.wrapper._probe_pool.shutdown)
+
+    def _touch(self, name):
+        open(os.path.join(self.dir, name), "w").close()
+
+    def _remove(self, name):
+        os.remove(os.path.join(self.dir, name))
+
+    def _scans(self):
+        try:
+            with open(os.path.join(self.dir, "calls")) as f:
+                return f.read().split().count("--list-networks")
+        except FileNotFoundError:
+            return 0
+
+    def _wait_for_scans(self, count):
+        deadline = time.monotonic() + 5
+        while self._scans() < count:
+            self.assertLess(time.monotonic(), deadline, "scan did not start")
+            time.sleep(0.01)
+
+    def _cache_expired_list(self):
+        """Cache OLD_NETWORKS and make every cached list count as expired"""
+        self.wrapper.cache_duration = 0
+        with self.wrapper._cache_lock:
+            self.wrapper._store_networks(OLD_NETWORKS)
+
+    def _run(self, **kwargs):
+        """Call refresh_network_cache in a thread; returns (thread, results list)"""
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(self.wrapper.refresh_network_cache(**kwargs)))
+        thread.start()
+        return thread, results
+
+    def test_cache_info_before_first_scan(self):
+        info = self.wrapper.get_cache_info()
+        self.assertFalse(info["cached"])
+        self.assertFalse(info["stale"])
+        self.assertEqual(info["networks_count"], 0)
+
+    def test_expired_cache_is_reported_stale(self):
+        self._cache_expired_list()
+        info = self.wrapper.get_cache_info()
+        self.assertTrue(info["cached"])
+        self.assertFalse(info["cache_valid"])
+        self.assertTrue(info["stale"])
+        self.assertEqual(info["networks_count"], 1)
+
+    def test_stale_list_served_while_one_background_refresh_runs(self):
+        self._cache_expired_list()
+        self._touch("hold")
+
+        self.assertEqual(self.wrapper.refresh_network_cache(allow_stale=True), OLD_NETWORKS)
+        self._wait_for_scans(1)
+        # A second caller gets the stale list too and does not start another refresh
+        self.assertEqual(self.wrapper.refresh_network_cache(allow_stale=True), OLD_NETWORKS)
+        self.assertTrue(self.wrapper.get_cache_info()["stale"])
+
+        self._remove("hold")
+        self.wrapper._refresh_thread.join(5)
+        self.assertEqual(self._scans(), 1)
+        self.assertEqual(self.wrapper._cache_snapshot[0], NEW_NETWORKS)
+
+    def test_concurrent_cold_refreshes_share_one_scan(self):
+        self._touch("hold")
+        runs = [self._run() for _ in range(3)]
+        self._wait_for_scans(1)
+        time.sleep(0.1)  # let the other callers reach the wait
+        self._remove("hold")
+        for thread, _ in runs:
+            thread.join(5)
+
+        self.assertEqual(self._scans(), 1)
+        for _, results in runs:
+            self.assertEqual(results, [NEW_NETWORKS])
+
+    def test_waiter_that_times_out_gets_the_cached_list(self):
+        self._cache_expired_list()
+        self.wrapper.refresh_wait_timeout = 0.1
+        self._touch("hold")
+        scanner, _ = self._run(force_rescan=True)
+        self._wait_for_scans(1)
+
+        started = time.monotonic()
+        self.assertEqual(self.wrapper.refresh_network_cache(force_rescan=True), OLD_NETWORKS)
+        self.assertLess(time.monotonic() - started, 2)
+
+        self._remove("hold")
+        scanner.join(5)
+        self.assertEqual(self._scans(), 1)
+
+    def test_failed_refresh_keeps_the_cached_list(self):
+        self._cache_expired_list()
+        self._touch("fail")
+        self._touch("hold")
+        scanner, scanner_results = self._run(force_rescan=True)
+        self._wait_for_scans(1)
+        waiter, waiter_results = self._run(force_rescan=True)
+        time.sleep(0.1)  # let the waiter reach the wait
+        self._remove("hold")
+        scanner.join(5)
+        waiter.join(5)
+
+        self.assertEqual(scanner_results[0]["error"], "scan_failed")
+        self.assertEqual(waiter_results, [OLD_NETWORKS])
+        self.assertEqual(self.wrapper._cache_snapshot[0], OLD_NETWORKS)
+        self.assertEqual(self._scans(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,11 +15,18 @@ from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+try:
+    import orjson  # noqa: F401 -- required by ORJSONResponse
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    from fastapi.responses import JSONResponse as DefaultResponse
 from pydantic import BaseModel
 import uvicorn
 from config import get_config
 
-# Get configuration
+# Get configuration. This loads it at import: the log level and the CORS
+# middleware below have to be set before the app starts, so Config's lazy
+# loading does not delay anything for this server
 config = get_config()
 
 # Configure logging
@@ -35,7 +42,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="WiFi Connect API",
     description="WiFi management API using nmcli and iw",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse
 )
 
 # Add CORS middleware
@@ -543,7 +551,10 @@ async def startup_wifi_check():
         
         await cleanup_startup_connections()
 
-        await list_networks(use_cache=False, force_scan=True)
+        # Look the interface up once; without one the initial scan cannot find anything
+        wifi_interface = get_wifi_interface()
+        if wifi_interface:
+            await list_networks(use_cache=False, force_scan=True)
         
         # Check if startup check is enabled
         if not config.get("wifi.startup_check", True):
@@ -553,7 +564,6 @@ async def startup_wifi_check():
         logger.info("Performing startup WiFi connectivity check...")
         
         # Check if WiFi interface is available
-        wifi_interface = get_wifi_interface()
         if not wifi_interface:
             logger.warning("No WiFi interface available, skipping startup check")
             return